@@ -5,9 +5,27 @@ Build orchestration for VFX Platform-compliant packages.
 Wraps conda-build with caching, logging, and dependency management.
 """
 
-from .cache import BuildCache
-from .container import ContainerBuilder
-from .core import VFXBuilder
+import importlib
 
 __all__ = ["VFXBuilder", "BuildCache", "ContainerBuilder"]
 __version__ = "0.1.0"
+
+# Public classes are imported on first access, so `import builder.cli` does
+# not pull in every submodule.
+_LAZY_IMPORTS = {
+    "BuildCache": ".cache",
+    "ContainerBuilder": ".container",
+    "VFXBuilder": ".core",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
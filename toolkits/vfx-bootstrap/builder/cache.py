@@ -6,9 +6,218 @@ Provides caching of built packages to avoid redundant builds.
 
 import hashlib
 import json
+import mmap
+import os
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    from blake3 import blake3
+except ImportError:  # optional dependency, see the "fast" extra
+    blake3 = None
+
+try:
+    import orjson
+except ImportError:  # optional dependency, see the "fast" extra
+    orjson = None
+
+# Digest algorithm used for package and recipe content hashes. BLAKE3 is
+# SIMD-accelerated and multithreaded; MD5 is the stdlib fallback.
+HASH_ALGORITHM = "blake3" if blake3 is not None else "md5"
+
+# Files smaller than this are read in one call instead of streamed
+_SMALL_FILE_SIZE = 4 * 1024
+# Files at least this large are hashed from a memory map in the MD5 fallback
+_MMAP_MIN_SIZE = 1024 * 1024
+
+
+def _new_hasher():
+    """Create a content hasher for HASH_ALGORITHM."""
+    if blake3 is not None:
+        return blake3(max_threads=blake3.AUTO)
+    return hashlib.md5()
+
+
+# Digest algorithm that addresses "cdc" chunks. Chunks are shared between
+# entries by name, so the fallback must be collision-resistant, unlike MD5.
+CHUNK_HASH_ALGORITHM = "blake3" if blake3 is not None else "blake2b"
+
+
+def _new_chunk_hasher():
+    """Create a content hasher for CHUNK_HASH_ALGORITHM."""
+    if blake3 is not None:
+        return blake3()
+    return hashlib.blake2b(digest_size=32)
+
+
+def _dump_json(obj, indent: bool = False) -> bytes:
+    """Serialize to JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+
+def _load_json(data: bytes):
+    """Parse JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _file_digest(file_path: Path) -> bytes:
+    """Compute the HASH_ALGORITHM digest of a file's contents."""
+    if blake3 is not None:
+        hasher = _new_hasher()
+        # Memory-mapped read, hashed across threads without a Python loop
+        hasher.update_mmap(file_path)
+        return hasher.digest()
+
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < _SMALL_FILE_SIZE:
+            # Most recipe files: a single read beats any setup cost
+            return hashlib.md5(f.read()).digest()
+        if size >= _MMAP_MIN_SIZE:
+            # Large artifacts: hash straight from the page cache in one update,
+            # with no read syscalls per chunk (the GIL is released meanwhile)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return hashlib.md5(mm).digest()
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+, reads in C
+            return hashlib.file_digest(f, "md5").digest()
+        hasher = hashlib.md5()
+        for chunk in iter(lambda: f.read(256 * 1024), b""):
+            hasher.update(chunk)
+        return hasher.digest()
+
+
+def _file_digest_as(file_path: Path, algorithm: str) -> Optional[bytes]:
+    """Digest of a file with a named algorithm, or None if it isn't available."""
+    if algorithm == HASH_ALGORITHM:
+        return _file_digest(file_path)
+    if algorithm != "md5":
+        return None
+    with open(file_path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(f, "md5").digest()
+        hasher = hashlib.md5()
+        for chunk in iter(lambda: f.read(256 * 1024), b""):
+            hasher.update(chunk)
+        return hasher.digest()
+
+
+def _copy_file(src: Path, dest: str) -> None:
+    """Copy a file and its metadata without routing bytes through Python."""
+    if hasattr(os, "copy_file_range"):  # Linux; reflinks on btrfs/XFS
+        try:
+            with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+        except OSError:
+            # Unsupported by the filesystem or kernel: sendfile/CopyFileEx path
+            shutil.copyfile(src, dest)
+    else:
+        shutil.copyfile(src, dest)
+    shutil.copystat(src, dest)
+
+
+def _link_or_copy(src: Path, dest: str) -> None:
+    """
+    Place a file in the cache, hardlinking when on the same filesystem.
+
+    The link shares the build output's inode, so BuildCache.get() checks
+    linked entries against their recorded digest before returning them.
+    """
+    try:
+        os.unlink(dest)
+    except FileNotFoundError:
+        pass
+
+    try:
+        os.link(src, dest)
+        return
+    except OSError:
+        # Cross-device or unsupported by the filesystem
+        pass
+
+    _copy_file(src, dest)
+
+
+def _stat_key(st: os.stat_result) -> List[int]:
+    """Stat fields that change when a file is rewritten, as stored in metadata."""
+    return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+
+def _tree_size(path: str) -> int:
+    """Total size in bytes of the regular files under a directory."""
+    total = 0
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                total += _tree_size(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                total += entry.stat(follow_symlinks=False).st_size
+    return total
+
+
+# Content-defined chunking (FastCDC with a Gear rolling hash) for the "cdc"
+# cache mode. Chunk boundaries depend only on content, so packages that share
+# large payloads produce identical chunks that are stored once.
+_CDC_MIN_SIZE = 16 * 1024
+_CDC_AVG_SIZE = 64 * 1024
+_CDC_MAX_SIZE = 256 * 1024
+_MASK64 = (1 << 64) - 1
+# Normalized chunking: a stricter mask (18 bits) before the average size and a
+# looser one (14 bits) after it pulls chunk sizes towards _CDC_AVG_SIZE.
+_CDC_MASK_S = ((1 << 18) - 1) << 46
+_CDC_MASK_L = ((1 << 14) - 1) << 50
+# The Gear loop runs per byte in Python at roughly 8 MiB/s, so larger packages
+# are stored whole even in "cdc" mode rather than stalling the build for minutes
+CDC_MAX_PACKAGE_SIZE = 64 * 1024 * 1024
+# Fixed table of 256 pseudo-random 64-bit values; must never change, or chunks
+# written by earlier versions stop deduplicating against new ones.
+_GEAR = tuple(int.from_bytes(hashlib.md5(bytes([i])).digest()[:8], "little") for i in range(256))
+
+
+def _cdc_boundaries(data) -> Iterator[Tuple[int, int]]:
+    """Yield (start, end) offsets of the content-defined chunks of a buffer."""
+    gear = _GEAR
+    size = len(data)
+    start = 0
+    while start < size:
+        if size - start <= _CDC_MIN_SIZE:
+            yield start, size
+            return
+
+        end = min(start + _CDC_MAX_SIZE, size)
+        normal = min(start + _CDC_AVG_SIZE, end)
+        cut = end
+        h = 0
+        # Cut points are never placed below the minimum size, so skip hashing it
+        pos = start + _CDC_MIN_SIZE
+        for byte in data[pos:normal]:
+            h = ((h << 1) + gear[byte]) & _MASK64
+            pos += 1
+            if not h & _CDC_MASK_S:
+                cut = pos
+                break
+        else:
+            for byte in data[normal:end]:
+                h = ((h << 1) + gear[byte]) & _MASK64
+                pos += 1
+                if not h & _CDC_MASK_L:
+                    cut = pos
+                    break
+
+        yield start, cut
+        start = cut
 
 
 class BuildCache:
@@ -17,94 +226,175 @@ class BuildCache:
 
     Stores built packages keyed by a hash of the build inputs
     (recipe, config, dependencies).
+
+    Keep the cache directory on the same filesystem as the build output
+    directory: packages are then hardlinked into the cache instead of copied.
+
+    In "cdc" mode packages are instead split into content-defined chunks
+    stored once under chunks/, deduplicating payloads shared between
+    packages. Chunking runs at roughly 8 MiB/s, so this trades build time for
+    disk; packages over CDC_MAX_PACKAGE_SIZE are stored whole.
     """
 
-    def __init__(self, cache_dir: Union[str, Path]):
+    CACHE_MODES = ("file", "cdc")
+
+    def __init__(self, cache_dir: Union[str, Path], cache_mode: str = "file"):
         """
         Initialize the cache.
 
         Args:
             cache_dir: Root directory for the cache.
+            cache_mode: How new entries are stored: "file" (whole packages)
+                or "cdc" (deduplicated chunks).
         """
-        self.root = Path(cache_dir).resolve()
-        self.cache = self.root / "packages"
-        self.metadata = self.root / "metadata"
-        self.tmp = self.root / "tmp"
+        if cache_mode not in self.CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {cache_mode}")
 
-        # Create directories
-        self.cache.mkdir(parents=True, exist_ok=True)
-        self.metadata.mkdir(parents=True, exist_ok=True)
-        self.tmp.mkdir(parents=True, exist_ok=True)
-
-    def get(self, key: str) -> Optional[List[Path]]:
+        self.root = Path(cache_dir).resolve()
+        self.cache_mode = cache_mode
+
+        # Directories are created on first write (see the properties below),
+        # so read-only commands like "cache status" never touch the disk.
+        # Hot paths join plain strings rather than building Path objects.
+        root = str(self.root)
+        self._cache_str = os.path.join(root, "packages")
+        self._metadata_str = os.path.join(root, "metadata")
+        self._tmp_str = os.path.join(root, "tmp")
+        self._chunks_str = os.path.join(root, "chunks")
+
+    @cached_property
+    def cache(self) -> Path:
+        """Package directory, created on first access."""
+        os.makedirs(self._cache_str, exist_ok=True)
+        return Path(self._cache_str)
+
+    @cached_property
+    def metadata(self) -> Path:
+        """Metadata directory, created on first access."""
+        os.makedirs(self._metadata_str, exist_ok=True)
+        return Path(self._metadata_str)
+
+    @cached_property
+    def tmp(self) -> Path:
+        """Scratch directory, created on first access."""
+        os.makedirs(self._tmp_str, exist_ok=True)
+        return Path(self._tmp_str)
+
+    def get(self, key: str, dest_dir: Optional[Union[str, Path]] = None) -> Optional[List[Path]]:
         """
         Get cached packages for a key.
 
+        Chunked ("cdc") entries are rebuilt from their chunks into
+        dest_dir/<subdir>/, reusing a package already there when its size and
+        digest match. Without a dest_dir they are rebuilt under tmp/<key>/,
+        which delete() and clear() remove.
+
         Args:
             key: Cache key (hash string).
+            dest_dir: Directory to rebuild chunked packages into.
 
         Returns:
             List of cached package paths, or None if not cached.
         """
-        cache_entry = self.cache / key
-        if not cache_entry.exists():
+        cache_entry = os.path.join(self._cache_str, key)
+        meta_file = os.path.join(self._metadata_str, key + ".json")
+
+        # A missing metadata file or entry directory both mean a cache miss
+        try:
+            with open(meta_file, "rb") as f:
+                meta = _load_json(f.read())
+
+            packages = meta.get("packages", [])
+            filenames = [pkg_info["filename"] for pkg_info in packages]
+            if not filenames:
+                return None
+
+            # Chunked packages are stored as a manifest instead of the file
+            cdc_entry = meta.get("storage") == "cdc"
+            chunked = [pkg_info.get("chunked", cdc_entry) for pkg_info in packages]
+            stored = [
+                f"{name}.manifest" if is_chunked else name
+                for name, is_chunked in zip(filenames, chunked)
+            ]
+
+            # Verify all packages exist with one directory listing
+            with os.scandir(cache_entry) as it:
+                present = {entry.name for entry in it}
+
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
             return None
 
-        # Read metadata
-        meta_file = self.metadata / f"{key}.json"
-        if not meta_file.exists():
+        if not present.issuperset(stored):
+            # Cache entry is incomplete
             return None
 
-        try:
-            with open(meta_file) as f:
-                meta = json.load(f)
-
-            # Verify all packages exist
-            packages = []
-            for pkg_info in meta.get("packages", []):
-                pkg_path = cache_entry / pkg_info["filename"]
-                if pkg_path.exists():
-                    packages.append(pkg_path)
-                else:
-                    # Cache entry is incomplete
+        # A hardlinked package shares its inode with the build output, which a
+        # later build under the same filename truncates and rewrites in place.
+        # That changes the inode's size or mtime, so unchanged stat fields
+        # vouch for the file and only a changed one is re-hashed.
+        for pkg_info, is_chunked in zip(packages, chunked):
+            if is_chunked:
+                continue
+            path = os.path.join(cache_entry, pkg_info["filename"])
+            st = os.stat(path)
+            if st.st_nlink > 1 and _stat_key(st) != pkg_info.get("stat"):
+                if not self._is_intact(path, pkg_info):
                     return None
 
-            return packages if packages else None
-
-        except (json.JSONDecodeError, KeyError):
-            return None
+        if any(chunked):
+            out_dir = os.path.join(self._tmp_str, key) if dest_dir is None else os.fspath(dest_dir)
+            return self._reassemble(cache_entry, packages, chunked, out_dir)
+        return [Path(cache_entry, filename) for filename in filenames]
 
     def put(self, key: str, packages: List[Path], metadata: Optional[dict] = None) -> None:
         """
         Store packages in the cache.
 
+        Each package's digest is recorded under its algorithm name (e.g.
+        "blake3" or "md5"), so entries written by older versions stay readable.
+
         Args:
             key: Cache key (hash string).
             packages: List of package paths to cache.
             metadata: Optional additional metadata.
         """
-        cache_entry = self.cache / key
-        cache_entry.mkdir(parents=True, exist_ok=True)
-
-        # Copy packages to cache
-        pkg_info = []
-        for pkg_path in packages:
-            if pkg_path.exists():
-                dest = cache_entry / pkg_path.name
-                shutil.copy2(pkg_path, dest)
-                pkg_info.append(
-                    {
-                        "filename": pkg_path.name,
-                        "size": pkg_path.stat().st_size,
-                        "md5": self._compute_md5(pkg_path),
-                    }
-                )
+        cache_entry = os.path.join(self._cache_str, key)
+        os.makedirs(cache_entry, exist_ok=True)
+
+        def store(pkg_path: Path) -> dict:
+            info = {"filename": pkg_path.name, "size": pkg_path.stat().st_size}
+            info["chunked"] = self.cache_mode == "cdc" and info["size"] <= CDC_MAX_PACKAGE_SIZE
+            if info["chunked"]:
+                self._store_chunks(pkg_path, cache_entry)
+                # Platform subdir (e.g. linux-64), restored when rebuilding
+                info["subdir"] = pkg_path.parent.name
+            else:
+                if self.cache_mode == "cdc":
+                    limit = CDC_MAX_PACKAGE_SIZE // (1024 * 1024)
+                    print(f"[CACHE] {pkg_path.name} is over {limit} MiB, storing it unchunked")
+                stored_path = os.path.join(cache_entry, pkg_path.name)
+                _link_or_copy(pkg_path, stored_path)
+                # Checked by get() to detect the file changing behind a hardlink
+                info["stat"] = _stat_key(os.stat(stored_path))
+            info[HASH_ALGORITHM] = self._compute_digest(pkg_path)
+            return info
+
+        # Copy packages to cache. Each is independent IO plus hashing, both of
+        # which release the GIL; map() keeps the metadata in input order.
+        existing = [p for p in packages if p.exists()]
+        if len(existing) > 1:
+            with ThreadPoolExecutor(max_workers=min(4, len(existing))) as pool:
+                pkg_info = list(pool.map(store, existing))
+        else:
+            pkg_info = [store(p) for p in existing]
 
         # Write metadata
         meta = {"key": key, "packages": pkg_info, **(metadata or {})}
-        meta_file = self.metadata / f"{key}.json"
-        with open(meta_file, "w") as f:
-            json.dump(meta, f, indent=2)
+        if self.cache_mode == "cdc":
+            meta["storage"] = "cdc"
+        meta_file = os.path.join(self.metadata, key + ".json")
+        with open(meta_file, "wb") as f:
+            f.write(_dump_json(meta, indent=True))
 
     def delete(self, key: str) -> bool:
         """
@@ -116,19 +406,115 @@ class BuildCache:
         Returns:
             True if entry was deleted, False if not found.
         """
-        cache_entry = self.cache / key
-        meta_file = self.metadata / f"{key}.json"
+        cache_entry = os.path.join(self._cache_str, key)
+        meta_file = os.path.join(self._metadata_str, key + ".json")
 
         deleted = False
-        if cache_entry.exists():
+        if os.path.exists(cache_entry):
             shutil.rmtree(cache_entry)
             deleted = True
-        if meta_file.exists():
-            meta_file.unlink()
+        # Packages rebuilt from chunks without a destination directory
+        shutil.rmtree(os.path.join(self._tmp_str, key), ignore_errors=True)
+        try:
+            os.unlink(meta_file)
             deleted = True
+        except FileNotFoundError:
+            pass
 
         return deleted
 
+    def _store_chunks(self, pkg_path: Path, cache_entry: str) -> None:
+        """Split a package into chunks and write its chunk manifest."""
+        os.makedirs(self._chunks_str, exist_ok=True)
+
+        digests = []
+        with open(pkg_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            try:
+                for start, end in _cdc_boundaries(view):
+                    chunk = view[start:end]
+                    hasher = _new_chunk_hasher()
+                    hasher.update(chunk)
+                    digest = hasher.hexdigest()
+                    digests.append(digest)
+
+                    chunk_file = os.path.join(self._chunks_str, digest)
+                    if not os.path.exists(chunk_file):
+                        tmp = f"{chunk_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+                        with open(tmp, "wb") as out:
+                            out.write(chunk)
+                        os.replace(tmp, chunk_file)
+            finally:
+                if size:
+                    view.close()
+
+        manifest = os.path.join(cache_entry, pkg_path.name + ".manifest")
+        with open(manifest, "wb") as f:
+            f.write(_dump_json({"algorithm": CHUNK_HASH_ALGORITHM, "chunks": digests}))
+
+    def _reassemble(
+        self, cache_entry: str, packages: List[dict], chunked: List[bool], out_dir: str
+    ) -> Optional[List[Path]]:
+        """Rebuild chunked packages under out_dir, or None if any chunk is missing or corrupt."""
+        paths = []
+        for pkg_info, is_chunked in zip(packages, chunked):
+            filename = pkg_info["filename"]
+            if not is_chunked:
+                paths.append(Path(cache_entry, filename))
+                continue
+            pkg_dir = os.path.join(out_dir, pkg_info.get("subdir", ""))
+            out_file = os.path.join(pkg_dir, filename)
+            if not self._is_intact(out_file, pkg_info):
+                try:
+                    with open(os.path.join(cache_entry, filename + ".manifest"), "rb") as f:
+                        manifest = _load_json(f.read())
+                    if manifest.get("algorithm") != CHUNK_HASH_ALGORITHM:
+                        # Chunks can't be verified with this build's hasher
+                        return None
+
+                    os.makedirs(pkg_dir, exist_ok=True)
+                    # Write to a temporary name so a partial file is never reused
+                    tmp = f"{out_file}.{os.getpid()}.tmp"
+                    try:
+                        with open(tmp, "wb") as out:
+                            for digest in manifest["chunks"]:
+                                with open(os.path.join(self._chunks_str, digest), "rb") as chunk:
+                                    data = chunk.read()
+                                hasher = _new_chunk_hasher()
+                                hasher.update(data)
+                                if hasher.hexdigest() != digest:
+                                    return None
+                                out.write(data)
+                        os.replace(tmp, out_file)
+                    finally:
+                        if os.path.exists(tmp):
+                            os.unlink(tmp)
+                except (FileNotFoundError, json.JSONDecodeError, KeyError):
+                    # Missing chunk or manifest: treat the entry as incomplete
+                    return None
+            paths.append(Path(out_file))
+
+        return paths
+
+    def _is_intact(self, path: str, pkg_info: dict) -> bool:
+        """
+        Whether a file matches the size and digest recorded for a package.
+
+        The digest is checked with the algorithm that recorded it, so entries
+        written before blake3 was installed still verify.
+        """
+        try:
+            if os.stat(path).st_size != pkg_info.get("size"):
+                return False
+        except FileNotFoundError:
+            return False
+        for algorithm in (HASH_ALGORITHM, "blake3", "md5"):
+            if algorithm in pkg_info:
+                digest = _file_digest_as(Path(path), algorithm)
+                return digest is not None and digest.hex() == pkg_info[algorithm]
+        return False
+
     def clear(self) -> int:
         """
         Clear all cache entries.
@@ -137,12 +523,26 @@ class BuildCache:
             Number of entries cleared.
         """
         count = 0
-        for entry in self.cache.iterdir():
-            if entry.is_dir():
-                shutil.rmtree(entry)
-                count += 1
-        for meta_file in self.metadata.glob("*.json"):
-            meta_file.unlink()
+        try:
+            with os.scandir(self._cache_str) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        shutil.rmtree(entry.path)
+                        count += 1
+        except FileNotFoundError:
+            pass
+
+        try:
+            with os.scandir(self._metadata_str) as it:
+                for entry in it:
+                    if entry.name.endswith(".json"):
+                        os.unlink(entry.path)
+        except FileNotFoundError:
+            pass
+
+        # Chunks are shared between entries, so they are only reclaimed here
+        for shared in (self._chunks_str, self._tmp_str):
+            shutil.rmtree(shared, ignore_errors=True)
 
         return count
 
@@ -153,43 +553,164 @@ class BuildCache:
         Returns:
             Dictionary with cache statistics.
         """
-        entries = list(self.cache.iterdir())
-        total_size = sum(
-            f.stat().st_size for entry in entries for f in entry.glob("**/*") if f.is_file()
-        )
+        num_entries = 0
+        total_size = 0
+        try:
+            with os.scandir(self._cache_str) as it:
+                for entry in it:
+                    num_entries += 1
+                    if entry.is_dir(follow_symlinks=False):
+                        total_size += _tree_size(entry.path)
+        except FileNotFoundError:
+            pass
+
+        if os.path.isdir(self._chunks_str):
+            total_size += _tree_size(self._chunks_str)
 
         return {
             "cache_dir": str(self.root),
-            "num_entries": len(entries),
+            "num_entries": num_entries,
             "total_size_bytes": total_size,
             "total_size_mb": total_size / (1024 * 1024),
         }
 
-    def list_entries(self) -> List[dict]:
+    def list_entries(self) -> Iterator[dict]:
         """
-        List all cache entries.
+        Iterate over all cache entries.
 
-        Returns:
-            List of entry metadata dictionaries.
+        Yields:
+            Entry metadata dictionaries.
         """
-        entries = []
-        for meta_file in self.metadata.glob("*.json"):
-            try:
-                with open(meta_file) as f:
-                    meta = json.load(f)
-                entries.append(meta)
-            except (json.JSONDecodeError, OSError):
-                continue
-        return entries
+        try:
+            it = os.scandir(self._metadata_str)
+        except FileNotFoundError:
+            return
+
+        with it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    with open(entry.path, "rb") as f:
+                        meta = _load_json(f.read())
+                except (json.JSONDecodeError, OSError):
+                    continue
+                yield meta
 
     @staticmethod
-    def _compute_md5(file_path: Path) -> str:
-        """Compute MD5 hash of a file."""
-        hasher = hashlib.md5()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(8192), b""):
-                hasher.update(chunk)
-        return hasher.hexdigest()
+    def _compute_digest(file_path: Path) -> str:
+        """Compute the HASH_ALGORITHM digest of a file."""
+        return _file_digest(file_path).hex()
+
+
+# Upper bound on the files remembered by the persistent digest cache
+_HASH_CACHE_MAX_ENTRIES = 20_000
+
+
+def _hash_cache_file() -> Path:
+    """Location of the persistent per-file digest cache."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(cache_home, "vfx-bootstrap", "hash-cache.json")
+
+
+def _load_hash_cache(path: Path) -> Dict[str, list]:
+    """Load the {path: [size, mtime_ns, digest]} map, or {} if unusable."""
+    try:
+        with open(path, "rb") as f:
+            data = _load_json(f.read())
+    except (OSError, ValueError):
+        return {}
+
+    # Digests from a different algorithm can't be reused
+    if not isinstance(data, dict) or data.get("algorithm") != HASH_ALGORITHM:
+        return {}
+    return data.get("files", {})
+
+
+def _save_hash_cache(path: Path, files: Dict[str, list]) -> None:
+    """
+    Atomically write the per-file digest cache.
+
+    Entries for files that no longer exist are dropped, and beyond
+    _HASH_CACHE_MAX_ENTRIES the oldest ones are too, so the cache doesn't grow
+    with every checkout and temporary directory ever hashed.
+    """
+    files = {p: entry for p, entry in files.items() if os.path.exists(p)}
+    if len(files) > _HASH_CACHE_MAX_ENTRIES:
+        # Insertion order: entries (re)hashed most recently come last
+        files = dict(list(files.items())[-_HASH_CACHE_MAX_ENTRIES:])
+
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(_dump_json({"algorithm": HASH_ALGORITHM, "files": files}))
+        os.replace(tmp, path)
+    except OSError:
+        # The cache is only an optimization; never fail a build over it
+        pass
+
+
+def _walk_files(root: str) -> List[Tuple[str, os.stat_result]]:
+    """(path, stat) of every regular file under root, sorted by path."""
+    files = []
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    files.append((entry.path, entry.stat()))
+    files.sort()
+    return files
+
+
+@lru_cache(maxsize=None)
+def _recipe_digest(recipe_dir: Path) -> bytes:
+    """
+    Compute a digest of every file under a recipe directory.
+
+    Memoized for the lifetime of the process, since recipe files don't
+    change during a single CLI invocation; call cache_clear() if they do.
+    """
+    hasher = _new_hasher()
+
+    # Reuse digests of files whose size and mtime are unchanged since the
+    # last run, so warm builds only stat() recipe files instead of reading them.
+    cache_file = _hash_cache_file()
+    known = _load_hash_cache(cache_file)
+    digests: Dict[str, bytes] = {}
+    stale: List[str] = []
+
+    files = _walk_files(os.path.abspath(recipe_dir))
+    for path, st in files:
+        entry = known.get(path)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            digests[path] = bytes.fromhex(entry[2])
+        else:
+            stale.append(path)
+            # Re-inserted at the end, so pruning keeps recently hashed files
+            known.pop(path, None)
+            known[path] = [st.st_size, st.st_mtime_ns, None]
+
+    # Per-file digests are independent, so compute them in parallel
+    # (hashlib and blake3 release the GIL).
+    if stale:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            for path, digest in zip(stale, pool.map(_file_digest, stale)):
+                digests[path] = digest
+                known[path][2] = digest.hex()
+        _save_hash_cache(cache_file, known)
+
+    # Fold in sorted path order to keep the result deterministic. Paths are
+    # relative, so a moved file changes the digest but a moved recipe doesn't.
+    root_len = len(os.path.abspath(recipe_dir)) + 1
+    for path, _ in files:
+        hasher.update(path[root_len:].replace(os.sep, "/").encode())
+        hasher.update(digests[path])
+
+    return hasher.digest()
 
 
 def compute_config_hash(
@@ -204,15 +725,12 @@ def compute_config_hash(
         dependencies: Dictionary of dependency package hashes.
 
     Returns:
-        MD5 hash string.
+        HASH_ALGORITHM hex digest string.
     """
-    hasher = hashlib.md5()
+    hasher = _new_hasher()
 
-    # Hash recipe files
-    for file_path in sorted(recipe_dir.glob("**/*")):
-        if file_path.is_file():
-            hasher.update(file_path.name.encode())
-            hasher.update(file_path.read_bytes())
+    # Hash recipe files (walked once per recipe per process)
+    hasher.update(_recipe_digest(Path(recipe_dir)))
 
     # Hash config
     hasher.update(json.dumps(config, sort_keys=True).encode())
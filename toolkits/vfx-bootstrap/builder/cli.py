@@ -7,12 +7,15 @@ import sys
 from pathlib import Path
 
 from .cache import BuildCache
-from .container import ContainerBuilder
-from .core import VFXBuilder
+
+# VFXBuilder and ContainerBuilder are imported inside the commands that use
+# them, so light commands like `cache status` skip loading core and its deps.
 
 
 def cmd_build(args):
     """Handle build command."""
+    from .core import VFXBuilder
+
     builder = VFXBuilder(
         recipes_dir=args.recipes,
         output_dir=args.output,
@@ -22,6 +25,7 @@ def cmd_build(args):
         platform=args.platform,
         channels=args.channel,
         conda_build_exe=args.conda_build,
+        cache_mode=args.cache_mode,
     )
 
     if args.recipe:
@@ -34,18 +38,26 @@ def cmd_build(args):
         return 0 if result.success else 1
     else:
         # Build all or specified targets
-        results = builder.build_all(
-            targets=args.targets if args.targets else None,
-            use_cache=not args.no_cache,
-            verbose=args.verbose,
-            continue_on_error=args.continue_on_error,
-        )
+        try:
+            results = builder.build_all(
+                targets=args.targets if args.targets else None,
+                use_cache=not args.no_cache,
+                verbose=args.verbose,
+                continue_on_error=args.continue_on_error,
+                jobs=args.jobs,
+            )
+        except ValueError as e:
+            # Dependency cycle between recipes
+            print(f"Error: {e}")
+            return 1
         failed = sum(1 for r in results if not r.success)
         return 1 if failed > 0 else 0
 
 
 def cmd_list(args):
     """Handle list command."""
+    from .core import VFXBuilder
+
     builder = VFXBuilder(
         recipes_dir=args.recipes,
         output_dir=args.output or Path("."),
@@ -64,6 +76,8 @@ def cmd_list(args):
 
 def cmd_info(args):
     """Handle info command."""
+    from .core import VFXBuilder
+
     builder = VFXBuilder(
         recipes_dir=args.recipes,
         output_dir=args.output or Path("."),
@@ -83,6 +97,8 @@ def cmd_info(args):
 
 def cmd_order(args):
     """Handle order command (show build order)."""
+    from .core import VFXBuilder
+
     builder = VFXBuilder(
         recipes_dir=args.recipes,
         output_dir=args.output or Path("."),
@@ -90,11 +106,17 @@ def cmd_order(args):
     )
 
     targets = args.targets if args.targets else None
-    order = builder.resolve_build_order(targets)
+    try:
+        order = builder.resolve_build_order(targets)
+    except ValueError as e:
+        # Dependency cycle between recipes
+        print(f"Error: {e}")
+        return 1
 
     print(f"Build order ({len(order)} packages):")
     for i, recipe in enumerate(order, 1):
         print(f"  {i}. {recipe}")
+    return 0
 
 
 def cmd_cache(args):
@@ -103,7 +125,7 @@ def cmd_cache(args):
         print("Error: --cache-dir required for cache commands")
         return 1
 
-    cache = BuildCache(args.cache_dir)
+    cache = BuildCache(args.cache_dir, cache_mode=args.cache_mode)
 
     if args.cache_action == "status":
         status = cache.status()
@@ -112,7 +134,7 @@ def cmd_cache(args):
         print(f"Total size: {status['total_size_mb']:.2f} MB")
 
     elif args.cache_action == "list":
-        entries = cache.list_entries()
+        entries = list(cache.list_entries())
         print(f"Cache entries ({len(entries)}):")
         for entry in entries:
             print(f"  {entry['key']}")
@@ -129,6 +151,8 @@ def cmd_cache(args):
 
 def cmd_container(args):
     """Handle container subcommand."""
+    from .container import ContainerBuilder
+
     container = ContainerBuilder()
 
     if args.container_action == "status":
@@ -174,7 +198,6 @@ def main():
         "--recipes",
         "-r",
         type=Path,
-        default=_default_recipes_dir(),
         help="Recipes directory (default: auto-detected from package location)",
     )
     parser.add_argument(
@@ -194,6 +217,15 @@ def main():
         help="Local channel directory for publishing (default: ~/Development/vfx/channel)",
     )
     parser.add_argument("--cache-dir", type=Path, help="Build cache directory")
+    parser.add_argument(
+        "--cache-mode",
+        choices=BuildCache.CACHE_MODES,
+        default="file",
+        help=(
+            "Cache storage: whole files, or deduplicated chunks (default: file). "
+            "Chunking runs at about 8 MiB/s; packages over 64 MiB are stored whole"
+        ),
+    )
     parser.add_argument("--log-dir", type=Path, help="Log directory")
     parser.add_argument("--channel", "-c", action="append", help="Additional conda channels")
     parser.add_argument("--conda-build", help="Path to conda-build executable")
@@ -207,6 +239,13 @@ def main():
     build_parser.add_argument(
         "--continue-on-error", action="store_true", help="Continue after failures"
     )
+    build_parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Independent recipes to build concurrently (default: 1)",
+    )
     build_parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
     build_parser.set_defaults(func=cmd_build)
 
@@ -243,6 +282,9 @@ def main():
         parser.print_help()
         return 0
 
+    if args.recipes is None:
+        args.recipes = _default_recipes_dir()
+
     return args.func(args)
 
 
@@ -5,6 +5,7 @@ Provides Docker/Podman integration for isolated, reproducible builds.
 """
 
 import os
+import shutil
 import subprocess
 from pathlib import Path
 from typing import List, Optional, Union
@@ -24,6 +25,18 @@ class ContainerBuilder:
         "rocky9": "rockylinux:9",
     }
 
+    # Command run inside the container by build_in_container
+    BUILD_COMMAND = [
+        "conda",
+        "build",
+        "/recipe",
+        "--output-folder",
+        "/output",
+        "-c",
+        "conda-forge",
+        "--override-channels",
+    ]
+
     def __init__(self, runtime: str = "auto", default_image: str = "ubuntu22"):
         """
         Initialize container builder.
@@ -35,18 +48,25 @@ class ContainerBuilder:
         self.runtime = self._detect_runtime(runtime)
         self.default_image = self._resolve_image(default_image)
 
+        # Runtime version string, probed once on first use
+        self._version: Optional[str] = None
+
+        # Command prefix and default user shared by every container run
+        self._base_run_cmd = [self.runtime, "run", "--rm"]
+        if hasattr(os, "getuid"):
+            self._uid_gid: Optional[str] = f"{os.getuid()}:{os.getgid()}"
+        else:
+            self._uid_gid = None
+
     def _detect_runtime(self, runtime: str) -> str:
         """Detect available container runtime."""
         if runtime != "auto":
             return runtime
 
-        # Prefer podman if available (rootless)
+        # Prefer podman if available (rootless); a PATH lookup needs no fork
         for cmd in ["podman", "docker"]:
-            try:
-                subprocess.run([cmd, "--version"], capture_output=True, check=True)
+            if shutil.which(cmd):
                 return cmd
-            except (subprocess.CalledProcessError, FileNotFoundError):
-                continue
 
         raise RuntimeError("No container runtime found (docker or podman)")
 
@@ -56,11 +76,17 @@ class ContainerBuilder:
 
     def is_available(self) -> bool:
         """Check if container runtime is available."""
-        try:
-            subprocess.run([self.runtime, "info"], capture_output=True, check=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+        return self.runtime is not None and shutil.which(self.runtime) is not None
+
+    def version(self) -> str:
+        """Get the runtime version string (cached after the first call)."""
+        if self._version is None:
+            try:
+                result = subprocess.run([self.runtime, "--version"], capture_output=True, text=True)
+                self._version = result.stdout.strip()
+            except Exception:
+                self._version = "unknown"
+        return self._version
 
     def pull_image(self, image: Optional[str] = None) -> bool:
         """
@@ -113,9 +139,7 @@ class ContainerBuilder:
 
         # Build command
         cmd = [
-            self.runtime,
-            "run",
-            "--rm",
+            *self._base_run_cmd,
             "-v",
             f"{recipe_dir}:/recipe:ro",
             "-v",
@@ -124,35 +148,20 @@ class ContainerBuilder:
 
         # Add additional volumes
         if volumes:
-            for vol in volumes:
-                cmd.extend(["-v", vol])
+            cmd += [arg for vol in volumes for arg in ("-v", vol)]
 
         # Add environment variables
         if environment:
-            for key, value in environment.items():
-                cmd.extend(["-e", f"{key}={value}"])
+            cmd += [arg for key, value in environment.items() for arg in ("-e", f"{key}={value}")]
 
-        # Set user if specified
+        # Set user if specified, else run as current user to avoid permission issues
+        user = user or self._uid_gid
         if user:
-            cmd.extend(["--user", user])
-        else:
-            # Run as current user to avoid permission issues
-            cmd.extend(["--user", f"{os.getuid()}:{os.getgid()}"])
+            cmd += ["--user", user]
 
         # Image and command
         cmd.append(image)
-        cmd.extend(
-            [
-                "conda",
-                "build",
-                "/recipe",
-                "--output-folder",
-                "/output",
-                "-c",
-                "conda-forge",
-                "--override-channels",
-            ]
-        )
+        cmd += self.BUILD_COMMAND
 
         print(f"Running build in container: {image}")
         return subprocess.run(cmd)
@@ -173,12 +182,7 @@ class ContainerBuilder:
         """
         image = self._resolve_image(image) if image else self.default_image
 
-        cmd = [
-            self.runtime,
-            "run",
-            "--rm",
-            "-it",
-        ]
+        cmd = [*self._base_run_cmd, "-it"]
 
         if volumes:
             for vol in volumes:
@@ -274,11 +278,6 @@ WORKDIR /build
         }
 
         if info["available"]:
-            # Get runtime version
-            try:
-                result = subprocess.run([self.runtime, "--version"], capture_output=True, text=True)
-                info["version"] = result.stdout.strip()
-            except Exception:
-                info["version"] = "unknown"
+            info["version"] = self.version()
 
         return info
@@ -5,15 +5,61 @@ Manages the build process for VFX Platform packages using conda-build.
 """
 
 import datetime
+import hashlib
 import os
+import re
+import stat
 import subprocess
 import sys
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Union
+from typing import Dict, FrozenSet, List, Optional, Set, Union
 
 import yaml
 
-from .cache import BuildCache
+try:
+    # libyaml C bindings, several times faster than the pure-Python parser
+    from yaml import CSafeDumper as _SafeDumper
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeDumper as _SafeDumper
+    from yaml import SafeLoader as _SafeLoader
+
+try:
+    import xxhash
+except ImportError:  # optional dependency, see the "fast" extra
+    xxhash = None
+
+from .cache import BuildCache, _dump_json, _load_json, _recipe_digest
+
+
+def _key_digest(data: bytes) -> str:
+    """Non-cryptographic digest for cache keys: XXH3 when installed, else BLAKE2b."""
+    if xxhash is not None:
+        return xxhash.xxh3_64_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+# Path.resolve() results for this process, keyed by absolute input path; each
+# resolve walks the path with a realpath syscall per component
+_RESOLVED_CACHE: Dict[str, Path] = {}
+
+
+def _resolved(path: Union[str, Path]) -> Path:
+    """Path(path).resolve(), memoized for repeated builder instantiations."""
+    # Not abspath(): it folds ".." lexically, which resolve() must not do across symlinks
+    key = os.path.join(os.getcwd(), os.fspath(path))
+    resolved = _RESOLVED_CACHE.get(key)
+    if resolved is None:
+        resolved = _RESOLVED_CACHE[key] = Path(key).resolve()
+    return resolved
+
+
+# A YAML list item's leading package name, e.g. "boost" in "    - boost >=1.82".
+# Jinja expressions such as "- {{ compiler('cxx') }}" are skipped.
+_DEP_RE = re.compile(r"^[ \t]*-[ \t]+(?!\{\{)([A-Za-z0-9_][A-Za-z0-9_.\-]*)", re.MULTILINE)
 
 
 class BuildResult:
@@ -58,6 +104,7 @@ class VFXBuilder:
         platform: str = "vfx2024",
         channels: Optional[List[str]] = None,
         conda_build_exe: Optional[str] = None,
+        cache_mode: str = "file",
     ):
         """
         Initialize the builder.
@@ -71,47 +118,64 @@ class VFXBuilder:
             platform: VFX Platform target (e.g., "vfx2024").
             channels: Additional conda channels.
             conda_build_exe: Path to conda-build executable.
+            cache_mode: Build cache storage mode ("file" or "cdc").
         """
-        self.recipes_dir = Path(recipes_dir).resolve()
-        self.output_dir = Path(output_dir).resolve()
+        self.recipes_dir = _resolved(recipes_dir)
+        self.output_dir = _resolved(output_dir)
         self.platform = platform
         self.conda_build_exe = conda_build_exe or "conda-build"
 
         # Local channel for publishing
         if channel_dir:
-            self.channel_dir = Path(channel_dir).resolve()
+            self.channel_dir = _resolved(channel_dir)
         else:
             self.channel_dir = self.output_dir.parent / "channel"
 
         # Set up cache
         if cache_dir:
-            self.cache_dir = Path(cache_dir).resolve()
-            self.cache = BuildCache(self.cache_dir)
+            self.cache_dir = _resolved(cache_dir)
+            self.cache = BuildCache(self.cache_dir, cache_mode=cache_mode)
         else:
             self.cache_dir = None
             self.cache = None
 
         # Set up logging
         if log_dir:
-            self.log_dir = Path(log_dir).resolve()
+            self.log_dir = _resolved(log_dir)
         else:
             self.log_dir = self.output_dir / "logs"
-        self.log_dir.mkdir(parents=True, exist_ok=True)
+        if not self.log_dir.is_dir():
+            self.log_dir.mkdir(parents=True, exist_ok=True)
 
         # Channels for dependency resolution
         self.channels = channels or ["conda-forge"]
 
         # Detect CPU count for parallel builds
         self.cpu_count = os.cpu_count() or 1
-
-        # Load VFX Platform configuration
+        # Concurrent builds in build_all; each one gets a share of the CPUs
+        self._build_jobs = 1
+        # Serializes copies into the local channel and its re-indexing
+        self._channel_lock = threading.Lock()
+        # Build subprocess environments by CPU share, built on first use
+        self._build_envs: Dict[int, dict] = {}
+
+        # Load VFX Platform configuration, and hash it once for cache keys
         self.config = self._load_platform_config()
+        self._config_hash = _key_digest(
+            yaml.dump(self.config, Dumper=_SafeDumper, sort_keys=True).encode()
+        )
+        self._cache_keys: Dict[str, str] = {}
+
+        # Built packages by package name, filled by _refresh_outputs_index()
+        self._outputs_index: Optional[Dict[str, List[Path]]] = None
 
         # Discover available recipes
         self.recipes = self._discover_recipes()
 
         # Build dependency graph
         self.dependencies = self._build_dependency_graph()
+        # resolve_build_order results, keyed by the targets tuple
+        self._order_cache: Dict[Optional[tuple], List[str]] = {}
 
         # Initialize local channel
         self._initialize_channel()
@@ -136,49 +200,101 @@ class VFXBuilder:
         config_file = self.recipes_dir / "conda_build_config.yaml"
         if config_file.exists():
             with open(config_file) as f:
-                return yaml.safe_load(f)
+                return yaml.load(f, Loader=_SafeLoader)
         return {}
 
     def _discover_recipes(self) -> Dict[str, Path]:
-        """Discover all available recipes."""
+        """Discover all available recipes, recording each meta.yaml stat."""
         recipes = {}
-        for item in self.recipes_dir.iterdir():
-            if item.is_dir():
-                meta_yaml = item / "meta.yaml"
-                if meta_yaml.exists():
-                    recipes[item.name] = item
+        # meta.yaml stamps for _build_dependency_graph, so it needn't stat again
+        self._meta_stats: Dict[str, os.stat_result] = {}
+        with os.scandir(self.recipes_dir) as it:
+            for entry in it:
+                # DirEntry.is_dir() uses the readdir type, without a stat
+                if not entry.is_dir():
+                    continue
+                try:
+                    st = os.stat(os.path.join(entry.path, "meta.yaml"))
+                except OSError:
+                    continue
+                if stat.S_ISREG(st.st_mode):
+                    recipes[entry.name] = Path(entry.path)
+                    self._meta_stats[entry.name] = st
         return recipes
 
-    def _build_dependency_graph(self) -> Dict[str, Set[str]]:
-        """Build dependency graph from recipes."""
+    def _build_dependency_graph(self) -> Dict[str, FrozenSet[str]]:
+        """Build dependency graph, and its reverse in self.reverse_deps."""
+        cached = self._load_deps_cache()
+        entries = {}
+
         dependencies = {}
-        for name, recipe_dir in self.recipes.items():
-            deps = self._parse_recipe_dependencies(recipe_dir)
-            dependencies[name] = deps
+        self.reverse_deps: Dict[str, List[str]] = {}
+        for name in sorted(self.recipes):
+            meta_yaml = self.recipes[name] / "meta.yaml"
+            st = self._meta_stats.get(name)
+            stamp = None if st is None else [str(meta_yaml), st.st_mtime_ns, st.st_size]
+
+            entry = cached.get(name)
+            if stamp is not None and entry is not None and entry[0] == stamp:
+                deps = set(entry[1])
+            else:
+                deps = self._parse_recipe_dependencies(self.recipes[name])
+            deps.discard(name)
+            entries[name] = [stamp, sorted(deps)]
+
+            # Frozen, so callers can't mutate the graph behind the cached orders
+            dependencies[name] = frozenset(deps)
+            for dep in deps:
+                self.reverse_deps.setdefault(dep, []).append(name)
+
+        if entries != cached:
+            self._save_deps_cache(entries)
         return dependencies
 
+    def _deps_cache_file(self) -> Optional[Path]:
+        """Path of the parsed dependency cache, if a cache directory is set."""
+        return self.cache_dir / "recipe_deps.json" if self.cache_dir else None
+
+    def _load_deps_cache(self) -> Dict[str, list]:
+        """Load {recipe: [[path, mtime_ns, size], deps]}, or {} if unusable."""
+        cache_file = self._deps_cache_file()
+        if cache_file is None:
+            return {}
+        try:
+            with open(cache_file, "rb") as f:
+                data = _load_json(f.read())
+        except (OSError, ValueError):
+            return {}
+
+        # Parsed dependencies are filtered by the known recipes, so a change in
+        # the recipe set invalidates every entry
+        if not isinstance(data, dict) or data.get("recipes") != sorted(self.recipes):
+            return {}
+        return data.get("entries", {})
+
+    def _save_deps_cache(self, entries: Dict[str, list]) -> None:
+        """Atomically write the parsed dependency cache."""
+        cache_file = self._deps_cache_file()
+        if cache_file is None:
+            return
+        tmp = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(_dump_json({"recipes": sorted(self.recipes), "entries": entries}))
+            os.replace(tmp, cache_file)
+        except OSError:
+            # The cache is only an optimization
+            pass
+
     def _parse_recipe_dependencies(self, recipe_dir: Path) -> Set[str]:
         """Parse dependencies from a recipe's meta.yaml."""
-        meta_yaml = recipe_dir / "meta.yaml"
-        if not meta_yaml.exists():
-            return set()
-
         # Simple parsing - in production would use conda-build's render
-        deps = set()
         try:
-            with open(meta_yaml) as f:
-                content = f.read()
-                # Look for common dependency patterns
-                for line in content.split("\n"):
-                    line = line.strip()
-                    if line.startswith("- ") and not line.startswith("- {{"):
-                        # Extract package name (before version specifier)
-                        pkg = line[2:].split()[0].split(">")[0].split("<")[0].split("=")[0]
-                        if pkg in self.recipes:
-                            deps.add(pkg)
-        except Exception:
-            pass
-        return deps
+            content = (recipe_dir / "meta.yaml").read_text(encoding="utf-8", errors="ignore")
+        except OSError:
+            return set()
+        return {m.group(1) for m in _DEP_RE.finditer(content) if m.group(1) in self.recipes}
 
     def resolve_build_order(self, targets: Optional[List[str]] = None) -> List[str]:
         """
@@ -189,27 +305,46 @@ class VFXBuilder:
 
         Returns:
             List of recipe names in build order.
+
+        Raises:
+            ValueError: If the recipes have a dependency cycle.
         """
+        key = tuple(targets) if targets is not None else None
+        cached = self._order_cache.get(key)
+        if cached is not None:
+            return list(cached)
+
         if targets is None:
             targets = list(self.recipes.keys())
 
-        # Topological sort
-        visited = set()
+        # Targets plus everything they transitively depend on
+        target_set = dict.fromkeys(targets)
+        pending = list(target_set)
+        while pending:
+            for dep in sorted(self.dependencies.get(pending.pop(), ())):
+                if dep not in target_set:
+                    target_set[dep] = None
+                    pending.append(dep)
+
+        # Kahn's algorithm: repeatedly emit recipes with no unbuilt dependencies
+        in_degree = {recipe: len(self.dependencies.get(recipe, ())) for recipe in target_set}
+        ready = deque(recipe for recipe, degree in in_degree.items() if degree == 0)
         order = []
-
-        def visit(recipe: str):
-            if recipe in visited:
-                return
-            visited.add(recipe)
-            for dep in self.dependencies.get(recipe, set()):
-                if dep in targets or dep in self.recipes:
-                    visit(dep)
+        while ready:
+            recipe = ready.popleft()
             order.append(recipe)
+            for dependent in self.reverse_deps.get(recipe, ()):
+                if dependent in in_degree:
+                    in_degree[dependent] -= 1
+                    if in_degree[dependent] == 0:
+                        ready.append(dependent)
 
-        for target in targets:
-            visit(target)
+        if len(order) != len(in_degree):
+            cycle = sorted(recipe for recipe, degree in in_degree.items() if degree > 0)
+            raise ValueError(f"Dependency cycle between recipes: {', '.join(cycle)}")
 
-        return order
+        self._order_cache[key] = order
+        return list(order)
 
     def build(
         self,
@@ -239,7 +374,7 @@ class VFXBuilder:
         # Check cache first
         if use_cache and self.cache:
             cache_key = self._compute_cache_key(recipe)
-            cached_result = self.cache.get(cache_key)
+            cached_result = self.cache.get(cache_key, dest_dir=self.output_dir)
             if cached_result:
                 print(f"[CACHED] {recipe}")
                 return BuildResult(recipe=recipe, success=True, outputs=cached_result, cached=True)
@@ -273,36 +408,52 @@ class VFXBuilder:
         if verbose:
             print(f"[CMD] {' '.join(cmd)}")
 
-        # Prepare build environment with max CPU count
-        build_env = self._build_env()
-        build_env["CPU_COUNT"] = str(self.cpu_count)
-        # Some build tools look at these specifically
-        build_env["CMAKE_BUILD_PARALLEL_LEVEL"] = str(self.cpu_count)
+        # Prepare build environment with this build's share of the CPUs
+        cpu_count = max(1, self.cpu_count // self._build_jobs)
+        build_env = self._build_envs.get(cpu_count)
+        if build_env is None:
+            build_env = self._build_env()
+            build_env["CPU_COUNT"] = str(cpu_count)
+            # Some build tools look at these specifically
+            build_env["CMAKE_BUILD_PARALLEL_LEVEL"] = str(cpu_count)
+            self._build_envs[cpu_count] = build_env
 
         try:
             with open(log_file, "w", encoding="utf-8") as log:
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    encoding="utf-8",
-                    errors="backslashreplace",
-                    env=build_env,
-                    shell=(os.name == "nt"),
-                )
-
-                if process.stdout:
-                    for line in process.stdout:
-                        if verbose:
+                if verbose:
+                    # Tee output to the terminal and the log as it arrives
+                    process = subprocess.Popen(
+                        cmd,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.STDOUT,
+                        text=True,
+                        encoding="utf-8",
+                        errors="backslashreplace",
+                        env=build_env,
+                        shell=(os.name == "nt"),
+                    )
+
+                    if process.stdout:
+                        for line in process.stdout:
                             sys.stdout.write(line)
                             sys.stdout.flush()
-                        log.write(line)
-                        log.flush()
+                            log.write(line)
+                            log.flush()
+                else:
+                    # The child writes straight to the log file: no Python
+                    # loop, flat memory, and the log can be tailed live
+                    process = subprocess.Popen(
+                        cmd,
+                        stdout=log,
+                        stderr=subprocess.STDOUT,
+                        env=build_env,
+                        shell=(os.name == "nt"),
+                    )
 
                 process.wait()
 
             if process.returncode == 0:
+                self._refresh_outputs_index()
                 outputs = self._find_build_outputs(recipe)
 
                 # Publish to local channel
@@ -332,6 +483,7 @@ class VFXBuilder:
         use_cache: bool = True,
         verbose: bool = True,
         continue_on_error: bool = False,
+        jobs: int = 1,
     ) -> List[BuildResult]:
         """
         Build all specified packages in dependency order.
@@ -341,6 +493,8 @@ class VFXBuilder:
             use_cache: Whether to check build cache.
             verbose: Whether to show build output.
             continue_on_error: Continue building after failures.
+            jobs: Number of independent recipes to build concurrently. Build
+                output is only written to the log files when above 1.
 
         Returns:
             List of BuildResults for all builds.
@@ -352,14 +506,21 @@ class VFXBuilder:
             print(f"  {i}. {recipe}")
         print()
 
-        results = []
-        for recipe in build_order:
-            result = self.build(recipe, use_cache=use_cache, verbose=verbose)
-            results.append(result)
+        if jobs > 1:
+            self._build_jobs = jobs
+            try:
+                results = self._build_parallel(build_order, use_cache, jobs, continue_on_error)
+            finally:
+                self._build_jobs = 1
+        else:
+            results = []
+            for recipe in build_order:
+                result = self.build(recipe, use_cache=use_cache, verbose=verbose)
+                results.append(result)
 
-            if not result.success and not continue_on_error:
-                print(f"\nBuild failed for {recipe}. Stopping.")
-                break
+                if not result.success and not continue_on_error:
+                    print(f"\nBuild failed for {recipe}. Stopping.")
+                    break
 
         # Print summary
         print("\n" + "=" * 50)
@@ -380,6 +541,53 @@ class VFXBuilder:
 
         return results
 
+    def _build_parallel(
+        self, build_order: List[str], use_cache: bool, jobs: int, continue_on_error: bool
+    ) -> List[BuildResult]:
+        """Build recipes as soon as their dependencies are built, up to jobs at once."""
+        in_degree = {recipe: 0 for recipe in build_order}
+        for recipe in build_order:
+            for dep in self.dependencies.get(recipe, ()):
+                if dep in in_degree:
+                    in_degree[recipe] += 1
+        ready = deque(recipe for recipe in build_order if in_degree[recipe] == 0)
+
+        results = {}
+        stopped = False
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            running = {}
+            while running or (ready and not stopped):
+                while ready and not stopped and len(running) < jobs:
+                    recipe = ready.popleft()
+                    future = pool.submit(self.build, recipe, use_cache=use_cache, verbose=False)
+                    running[future] = recipe
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    recipe = running.pop(future)
+                    result = future.result()
+                    results[recipe] = result
+
+                    if result.success:
+                        for dependent in self.reverse_deps.get(recipe, ()):
+                            if dependent in in_degree:
+                                in_degree[dependent] -= 1
+                                if in_degree[dependent] == 0:
+                                    ready.append(dependent)
+                    elif not continue_on_error and not stopped:
+                        print(f"\nBuild failed for {recipe}. Stopping.")
+                        stopped = True
+
+        if not stopped:
+            # Recipes whose dependencies failed were never started
+            for recipe in build_order:
+                if recipe not in results:
+                    results[recipe] = BuildResult(
+                        recipe=recipe, success=False, error="Skipped: a dependency failed"
+                    )
+
+        return [results[recipe] for recipe in build_order if recipe in results]
+
     def publish_to_channel(self, recipe: str) -> bool:
         """
         Copy built packages for a recipe to the local channel and re-index.
@@ -398,19 +606,20 @@ class VFXBuilder:
             return False
 
         published = []
-        for pkg_path in outputs:
-            # Determine subdir from the package path (e.g. win-64, linux-64)
-            subdir = pkg_path.parent.name
-            dest_dir = self.channel_dir / subdir
-            dest_dir.mkdir(parents=True, exist_ok=True)
+        with self._channel_lock:
+            for pkg_path in outputs:
+                # Determine subdir from the package path (e.g. win-64, linux-64)
+                subdir = pkg_path.parent.name
+                dest_dir = self.channel_dir / subdir
+                dest_dir.mkdir(parents=True, exist_ok=True)
 
-            dest = dest_dir / pkg_path.name
-            shutil.copy2(pkg_path, dest)
-            published.append(dest)
-            print(f"[PUBLISH] {pkg_path.name} -> channel/{subdir}/")
+                dest = dest_dir / pkg_path.name
+                shutil.copy2(pkg_path, dest)
+                published.append(dest)
+                print(f"[PUBLISH] {pkg_path.name} -> channel/{subdir}/")
 
-        if published:
-            self._index_channel()
+            if published:
+                self._index_channel()
 
         return len(published) > 0
 
@@ -456,24 +665,36 @@ class VFXBuilder:
 
     def _compute_cache_key(self, recipe: str) -> str:
         """Compute cache key for a recipe."""
-        # Simple key based on recipe name and config
-        # In production, would include source hash, dependency hashes, etc.
-        import hashlib
-
-        key_data = f"{recipe}:{self.platform}:{yaml.dump(self.config)}"
-        return hashlib.md5(key_data.encode()).hexdigest()
+        # Recipe name, platform config, and a fingerprint of every file in the
+        # recipe directory (per-file digests are reused while size and mtime
+        # match). In production, would also include source and dependency hashes.
+        key = self._cache_keys.get(recipe)
+        if key is None:
+            fingerprint = _recipe_digest(self.recipes[recipe]).hex()
+            key_data = f"{recipe}:{self.platform}:{self._config_hash}:{fingerprint}"
+            key = _key_digest(key_data.encode())
+            self._cache_keys[recipe] = key
+        return key
+
+    def _refresh_outputs_index(self) -> None:
+        """Scan the output subdirs once and index packages by package name."""
+        index: Dict[str, List[Path]] = {}
+        for subdir in ["linux-64", "osx-64", "osx-arm64", "win-64", "noarch"]:
+            try:
+                with os.scandir(self.output_dir / subdir) as it:
+                    names = sorted(e.name for e in it if e.name.endswith((".conda", ".tar.bz2")))
+            except FileNotFoundError:
+                continue
+            for name in names:
+                # <name>-<version>-<build>.conda: the name may itself contain dashes
+                index.setdefault(name.rsplit("-", 2)[0], []).append(self.output_dir / subdir / name)
+        self._outputs_index = index
 
     def _find_build_outputs(self, recipe: str) -> List[Path]:
         """Find output packages for a recipe."""
-        outputs = []
-        for subdir in ["linux-64", "osx-64", "osx-arm64", "win-64", "noarch"]:
-            pkg_dir = self.output_dir / subdir
-            if pkg_dir.exists():
-                for pkg in pkg_dir.glob(f"{recipe}*.conda"):
-                    outputs.append(pkg)
-                for pkg in pkg_dir.glob(f"{recipe}*.tar.bz2"):
-                    outputs.append(pkg)
-        return outputs
+        if self._outputs_index is None:
+            self._refresh_outputs_index()
+        return list(self._outputs_index.get(recipe, ()))
 
     def list_recipes(self) -> List[str]:
         """List all available recipes."""
@@ -490,7 +711,7 @@ class VFXBuilder:
         info = {
             "name": recipe,
             "path": str(recipe_dir),
-            "dependencies": list(self.dependencies.get(recipe, set())),
+            "dependencies": list(self.dependencies.get(recipe, ())),
         }
 
         if meta_yaml.exists():
@@ -4,10 +4,7 @@ vfx-bootstrap Packager Module
 Format-agnostic packaging system for VFX software distribution.
 """
 
-from .exporters.archive import ArchiveExporter
-from .exporters.conda import CondaExporter
-from .exporters.tarball import TarballExporter
-from .schema import PackageManifest
+import importlib
 
 __all__ = [
     "PackageManifest",
@@ -16,3 +13,24 @@ __all__ = [
     "ArchiveExporter",
 ]
 __version__ = "0.1.0"
+
+# Public classes are imported on first access, so `import packager.cli` does
+# not pull in every exporter.
+_LAZY_IMPORTS = {
+    "ArchiveExporter": ".exporters.archive",
+    "CondaExporter": ".exporters.conda",
+    "PackageManifest": ".schema",
+    "TarballExporter": ".exporters.tarball",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
@@ -0,0 +1,189 @@
+"""
+Source tree walking and glob matching for the packager exporters.
+
+Walks use os.scandir, whose entries carry the file type from readdir, so
+enumerating a tree costs no stat per file the way pathlib globbing does.
+"""
+
+import os
+import re
+from bisect import bisect_left
+from fnmatch import translate
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, List, Optional, Pattern, Set, Tuple, Union
+
+_MAGIC_RE = re.compile(r"[*?[]")
+
+# A compiled glob: one regex per path segment, None for a "**" segment
+GlobSegments = Tuple[Optional[Pattern], ...]
+
+
+@lru_cache(maxsize=None)
+def compile_glob(pattern: str) -> GlobSegments:
+    """
+    Compile a Path.glob-style pattern for glob_match, once per pattern.
+
+    Args:
+        pattern: Relative pattern; "*" stays within a path segment and
+            "**" matches any number of directories.
+
+    Returns:
+        Compiled pattern segments.
+    """
+    return tuple(
+        None if seg == "**" else re.compile(translate(seg)) for seg in pattern.strip("/").split("/")
+    )
+
+
+def glob_match(segments: GlobSegments, rel_path: str) -> bool:
+    """Whether a '/'-separated relative path matches a compiled glob."""
+    return _match_parts(segments, rel_path.split("/"), 0, 0)
+
+
+def _match_parts(segments: GlobSegments, parts: List[str], i: int, j: int) -> bool:
+    while i < len(segments):
+        seg = segments[i]
+        if seg is None:
+            # "**" consumes zero or more leading parts
+            return any(_match_parts(segments, parts, i + 1, k) for k in range(j, len(parts) + 1))
+        if j == len(parts) or not seg.match(parts[j]):
+            return False
+        i += 1
+        j += 1
+    return j == len(parts)
+
+
+def iter_files(root: Union[str, Path], pattern: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Walk the files under a directory, optionally filtered by a glob pattern.
+
+    Without a pattern this recurses like Path.rglob("*"); with one it matches
+    like Path.glob(pattern). Only patterns without "**" follow directory symlinks.
+
+    Args:
+        root: Directory to walk.
+        pattern: Glob pattern relative to root (None = all files).
+
+    Yields:
+        (path, relative path) string pairs; relative paths use '/' separators.
+    """
+    root = os.fspath(root)
+    segments = pattern.strip("/").split("/") if pattern else []
+
+    # Start the walk below the pattern's literal leading directories
+    n = 0
+    while n < len(segments) - 1 and not _MAGIC_RE.search(segments[n]):
+        n += 1
+    prefix = "".join(seg + "/" for seg in segments[:n])
+    compiled = compile_glob("/".join(segments[n:])) if pattern else None
+
+    # Without "**" a pattern has a fixed depth, so the walk is bounded and may
+    # follow directory symlinks, as Path.glob does
+    bounded = compiled is not None and None not in compiled
+    max_depth = len(compiled) if bounded else None
+
+    stack = [(os.path.join(root, *segments[:n]), "", 1)]
+    while stack:
+        directory, rel_dir, depth = stack.pop()
+        try:
+            it = os.scandir(directory)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                rel = rel_dir + entry.name
+                if entry.is_dir(follow_symlinks=bounded):
+                    if max_depth is None or depth < max_depth:
+                        stack.append((entry.path, rel + "/", depth + 1))
+                elif entry.is_file() and (compiled is None or glob_match(compiled, rel)):
+                    yield entry.path, prefix + rel
+
+
+class FileTree:
+    """
+    Every file and directory under a root, listed by a single walk.
+
+    An export builds one and resolves all of its file mappings against it,
+    instead of walking the source tree again for each mapping.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        """
+        Walk a directory tree.
+
+        Args:
+            root: Directory to list; a missing directory lists as empty.
+        """
+        self.root = os.fspath(root)
+        files = []
+        # Relative paths, '/'-separated; directory symlinks are listed but not entered
+        self.dirs: Set[str] = set()
+        self.symlinked_dirs: List[str] = []
+
+        stack = [(self.root, "")]
+        while stack:
+            directory, rel_dir = stack.pop()
+            try:
+                it = os.scandir(directory)
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    rel = rel_dir + entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        self.dirs.add(rel)
+                        stack.append((entry.path, rel + "/"))
+                    elif entry.is_file():
+                        files.append(rel)
+                    elif entry.is_dir():
+                        self.dirs.add(rel)
+                        self.symlinked_dirs.append(rel)
+
+        # Sorted, so the files below a directory are one contiguous run
+        self.files: List[str] = sorted(files)
+
+    def glob(self, pattern: str) -> List[Tuple[str, str]]:
+        """
+        Files matching a glob pattern, as iter_files(root, pattern) yields them.
+
+        Args:
+            pattern: Glob pattern relative to the root.
+
+        Returns:
+            (path, relative path) pairs, sorted by relative path.
+        """
+        compiled = compile_glob(pattern)
+        if self.symlinked_dirs and None not in compiled:
+            # Fixed-depth patterns follow directory symlinks, which the listing doesn't
+            return sorted(iter_files(self.root, pattern), key=lambda item: item[1])
+        return [
+            (os.path.join(self.root, rel), rel) for rel in self.files if glob_match(compiled, rel)
+        ]
+
+    def walk(self, rel_dir: str) -> List[Tuple[str, str]]:
+        """
+        Files below a directory, as iter_files(root / rel_dir) yields them.
+
+        Args:
+            rel_dir: Directory relative to the root.
+
+        Returns:
+            (path, path relative to rel_dir) pairs, sorted by relative path.
+        """
+        rel_dir = os.path.normpath(rel_dir).replace(os.sep, "/")
+        outside = rel_dir == ".." or rel_dir.startswith("../") or os.path.isabs(rel_dir)
+        if outside or any(
+            rel_dir == link or rel_dir.startswith(link + "/") for link in self.symlinked_dirs
+        ):
+            # Not in the listing, or reached through a directory symlink
+            return sorted(iter_files(os.path.join(self.root, rel_dir)), key=lambda item: item[1])
+
+        prefix = "" if rel_dir == "." else rel_dir + "/"
+        found = []
+        for i in range(bisect_left(self.files, prefix), len(self.files)):
+            rel = self.files[i]
+            if not rel.startswith(prefix):
+                break
+            found.append((os.path.join(self.root, rel), rel[len(prefix) :]))
+        return found
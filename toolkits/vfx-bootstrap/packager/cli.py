@@ -6,14 +6,21 @@ import argparse
 import sys
 from pathlib import Path
 
-from .exporters import ArchiveExporter, CondaExporter, TarballExporter
 from .schema import PackageManifest
 
-EXPORTERS = {
-    "conda": CondaExporter,
-    "tarball": TarballExporter,
-    "archive": ArchiveExporter,
-}
+# Export formats, in "all" order; exporter classes are imported by cmd_package
+FORMATS = ["conda", "tarball", "archive"]
+
+
+def _load_exporters():
+    """Import the exporter classes, keyed by format name."""
+    from .exporters import ArchiveExporter, CondaExporter, TarballExporter
+
+    return {
+        "conda": CondaExporter,
+        "tarball": TarballExporter,
+        "archive": ArchiveExporter,
+    }
 
 
 def cmd_package(args):
@@ -25,16 +32,17 @@ def cmd_package(args):
     print(f"Source: {args.source}")
     print(f"Output: {args.output}")
 
-    formats = args.format if args.format != ["all"] else list(EXPORTERS.keys())
+    exporters = _load_exporters()
+    formats = args.format if args.format != ["all"] else FORMATS
 
     results = []
     for fmt in formats:
-        if fmt not in EXPORTERS:
+        if fmt not in exporters:
             print(f"Unknown format: {fmt}")
             continue
 
         print(f"\nExporting to {fmt}...")
-        exporter_class = EXPORTERS[fmt]
+        exporter_class = exporters[fmt]
         exporter = exporter_class(manifest)
 
         try:
@@ -161,7 +169,7 @@ def main():
         "-f",
         nargs="+",
         default=["tarball"],
-        choices=list(EXPORTERS.keys()) + ["all"],
+        choices=FORMATS + ["all"],
         help="Output format(s)",
     )
     pkg_parser.add_argument("--components", "-c", nargs="*", help="Components to include")
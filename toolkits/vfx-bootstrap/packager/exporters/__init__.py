@@ -2,9 +2,27 @@
 Package exporters for different distribution formats.
 """
 
-from .archive import ArchiveExporter
+import importlib
+
 from .base import Exporter
-from .conda import CondaExporter
-from .tarball import TarballExporter
 
 __all__ = ["Exporter", "CondaExporter", "TarballExporter", "ArchiveExporter"]
+
+# Exporters are imported on first access, so validation alone only needs .base
+_LAZY_IMPORTS = {
+    "ArchiveExporter": ".archive",
+    "CondaExporter": ".conda",
+    "TarballExporter": ".tarball",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
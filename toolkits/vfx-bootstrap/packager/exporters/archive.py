@@ -2,14 +2,120 @@
 Archive exporter for vfx-bootstrap (ZIP format).
 """
 
-import json
+import hashlib
+import os
+import sys
 import zipfile
-from datetime import datetime
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
+from .._walk import FileTree
 from ..schema import PackageManifest
-from .base import Exporter
+from .base import Exporter, _dump_json
+
+# Deflate level for archive members; level 1 is several times faster than the
+# default 6 on large binary payloads for a small size increase
+ZIP_COMPRESSLEVEL = 1
+
+# Formats that are already compressed and are stored as-is
+_STORED_EXTS = {
+    ".7z",
+    ".bz2",
+    ".conda",
+    ".exr",
+    ".gz",
+    ".jpeg",
+    ".jpg",
+    ".mp4",
+    ".png",
+    ".whl",
+    ".xz",
+    ".zip",
+    ".zst",
+}
+
+# Files below this size are read and compressed on worker threads (zlib releases
+# the GIL) and then written in archive order; larger ones are streamed.
+_PRECOMPRESS_MAX_SIZE = 32 * 1024 * 1024
+
+# Fixed timestamp for generated metadata members, so they are byte-identical
+# across runs with the same contents
+_METADATA_DATE_TIME = (2020, 1, 1, 0, 0, 0)
+
+# Read size for the single pass that checksums and compresses each file
+_CHUNK_SIZE = 1024 * 1024
+
+# Writing pre-compressed members drives private ZipFile state (_writecheck,
+# _didModify, start_dir, fp, _lock, ZipInfo.FileHeader), so it is limited to
+# the Python versions this package is tested on; others take the sequential
+# path through the public zf.open() API. Extend the range only after testing.
+_RAW_WRITE_SUPPORTED = (
+    (3, 10) <= sys.version_info[:2] <= (3, 11)
+    and hasattr(zipfile.ZipFile, "_writecheck")
+    and hasattr(zipfile.ZipInfo, "FileHeader")
+)
+
+
+def _is_stored(src_path: Union[str, Path]) -> bool:
+    """Whether a file is in an already-compressed format."""
+    return os.path.splitext(src_path)[1].lower() in _STORED_EXTS
+
+
+def _checksums(zinfo: zipfile.ZipInfo, sha256) -> Dict[str, object]:
+    """Integrity record for a written member, as listed in manifest.json."""
+    return {"size": zinfo.file_size, "crc32": f"{zinfo.CRC:08x}", "sha256": sha256.hexdigest()}
+
+
+def _compress_entry(src_path: str, dst: str) -> Tuple[zipfile.ZipInfo, bytes, dict]:
+    """Checksum and compress a file in one pass, into a ready-to-write member."""
+    zinfo = zipfile.ZipInfo.from_file(src_path, dst)
+    stored = _is_stored(src_path)
+    # Raw deflate stream (negative wbits), as stored in ZIP members
+    compressor = None if stored else zlib.compressobj(ZIP_COMPRESSLEVEL, zlib.DEFLATED, -15)
+
+    sha256 = hashlib.sha256()
+    crc = 0
+    size = 0
+    parts = []
+    buf = bytearray(_CHUNK_SIZE)
+    with open(src_path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            view = memoryview(buf)[:n]
+            sha256.update(view)
+            crc = zlib.crc32(view, crc)
+            size += n
+            parts.append(bytes(view) if stored else compressor.compress(view))
+    if compressor is not None:
+        parts.append(compressor.flush())
+    payload = b"".join(parts)
+
+    zinfo.compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+    zinfo.file_size = size
+    zinfo.CRC = crc
+    zinfo.compress_size = len(payload)
+    return zinfo, payload, _checksums(zinfo, sha256)
+
+
+def _write_compressed(zf: zipfile.ZipFile, zinfo: zipfile.ZipInfo, payload: bytes) -> None:
+    """Append an already-compressed member to a seekable ZipFile."""
+    with zf._lock:
+        zf.fp.seek(zf.start_dir)
+        zinfo.header_offset = zf.fp.tell()
+        zf._writecheck(zinfo)
+        zf._didModify = True
+        zip64 = max(zinfo.file_size, zinfo.compress_size) > zipfile.ZIP64_LIMIT
+        zf.fp.write(zinfo.FileHeader(zip64))
+        zf.fp.write(payload)
+        zf.start_dir = zf.fp.tell()
+        zf.filelist.append(zinfo)
+        zf.NameToInfo[zinfo.filename] = zinfo
 
 
 class ArchiveExporter(Exporter):
@@ -49,64 +155,127 @@ class ArchiveExporter(Exporter):
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
+        # Manifest aggregations and a walk of the source tree, computed once for
+        # validation and packaging
+        files = self.manifest.get_all_files(components)
+        deps = self.manifest.get_all_dependencies()
+        tree = FileTree(source_dir)
+
         # Validate source
-        missing = self.validate_source(source_dir, components)
+        missing = self.validate_source(source_dir, files=files, tree=tree)
         if missing:
             raise FileNotFoundError(f"Missing files: {missing}")
 
         output_file = output_dir / self.get_output_filename()
 
         # Create ZIP archive
-        with zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED) as zf:
+        with zipfile.ZipFile(
+            output_file, "w", zipfile.ZIP_DEFLATED, compresslevel=ZIP_COMPRESSLEVEL
+        ) as zf:
             # Add a top-level directory with package name
             root_dir = f"{self.manifest.name}-{self.manifest.version}"
 
             # Add files
-            files = self.manifest.get_all_files(components)
-            file_list = []
-
+            entries = []
             for file_mapping in files:
-                added = self._add_files_to_zip(zf, source_dir, file_mapping, root_dir)
-                file_list.extend(added)
+                entries.extend(self._collect_files(source_dir, file_mapping, root_dir, tree))
+
+            checksums = self._write_files(zf, entries)
+            file_list = [dst for _, dst in entries]
 
             # Add manifest
-            self._add_manifest(zf, root_dir, file_list)
+            self._add_manifest(zf, root_dir, file_list, deps, checksums)
 
             # Add README
-            self._add_readme(zf, root_dir)
+            self._add_readme(zf, root_dir, deps)
 
         return output_file
 
-    def _add_files_to_zip(
-        self, zf: zipfile.ZipFile, source_dir: Path, file_mapping, root_dir: str
-    ) -> List[str]:
-        """Add files matching a mapping to the ZIP archive."""
+    def _collect_files(
+        self, source_dir: Path, file_mapping, root_dir: str, tree: FileTree
+    ) -> List[Tuple[str, str]]:
+        """List (source path, archive name) pairs for the files matching a mapping."""
         added_files = []
 
         if "*" in file_mapping.src:
-            for src_path in source_dir.glob(file_mapping.src):
-                if src_path.is_file():
-                    dst = f"{root_dir}/{file_mapping.dst.rstrip('/')}/{src_path.name}"
-                    zf.write(src_path, dst)
-                    added_files.append(dst)
+            for src_path, _ in tree.glob(file_mapping.src):
+                dst = f"{root_dir}/{file_mapping.dst.rstrip('/')}/{os.path.basename(src_path)}"
+                added_files.append((src_path, dst))
         else:
             src_path = source_dir / file_mapping.src
             if src_path.exists():
                 if src_path.is_file():
                     dst = f"{root_dir}/{file_mapping.dst.rstrip('/')}/{src_path.name}"
-                    zf.write(src_path, dst)
-                    added_files.append(dst)
+                    added_files.append((str(src_path), dst))
                 elif src_path.is_dir():
-                    for item in src_path.rglob("*"):
-                        if item.is_file():
-                            rel = item.relative_to(src_path)
-                            dst = f"{root_dir}/{file_mapping.dst.rstrip('/')}/{rel}"
-                            zf.write(item, dst)
-                            added_files.append(dst)
+                    prefix = f"{root_dir}/{file_mapping.dst.rstrip('/')}/"
+                    for item, rel in tree.walk(file_mapping.src):
+                        added_files.append((item, prefix + rel))
 
         return added_files
 
-    def _add_manifest(self, zf: zipfile.ZipFile, root_dir: str, file_list: List[str]):
+    @staticmethod
+    def _write_file(zf: zipfile.ZipFile, src_path: Union[str, Path], dst: str) -> dict:
+        """Stream a file into the archive, checksumming it on the way through."""
+        zinfo = zipfile.ZipInfo.from_file(src_path, dst)
+        if _is_stored(src_path):
+            zinfo.compress_type = zipfile.ZIP_STORED
+        else:
+            zinfo.compress_type = zipfile.ZIP_DEFLATED
+            zinfo._compresslevel = ZIP_COMPRESSLEVEL
+
+        sha256 = hashlib.sha256()
+        buf = bytearray(_CHUNK_SIZE)
+        with open(src_path, "rb", buffering=0) as f, zf.open(zinfo, "w") as dest:
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                view = memoryview(buf)[:n]
+                sha256.update(view)
+                dest.write(view)
+        # CRC and size are filled in when the member is closed
+        return _checksums(zinfo, sha256)
+
+    def _write_files(self, zf: zipfile.ZipFile, entries: List[Tuple[str, str]]) -> Dict[str, dict]:
+        """Write files in order, compressing in parallel; returns checksums by name."""
+        checksums = {}
+        workers = os.cpu_count() or 1
+        if not _RAW_WRITE_SUPPORTED or workers == 1 or len(entries) < 2:
+            for src_path, dst in entries:
+                checksums[dst] = self._write_file(zf, src_path, dst)
+            return checksums
+
+        def flush(item: Tuple[str, str, Optional[Future]]) -> None:
+            src_path, dst, future = item
+            if future is None:
+                checksums[dst] = self._write_file(zf, src_path, dst)
+            else:
+                zinfo, payload, checksums[dst] = future.result()
+                _write_compressed(zf, zinfo, payload)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Bounded window of in-flight files, so memory stays flat
+            window = deque()
+            for src_path, dst in entries:
+                future = None
+                if os.path.getsize(src_path) < _PRECOMPRESS_MAX_SIZE:
+                    future = pool.submit(_compress_entry, src_path, dst)
+                window.append((src_path, dst, future))
+                if len(window) > 2 * workers:
+                    flush(window.popleft())
+            while window:
+                flush(window.popleft())
+        return checksums
+
+    def _add_manifest(
+        self,
+        zf: zipfile.ZipFile,
+        root_dir: str,
+        file_list: List[str],
+        deps: List[str],
+        checksums: Dict[str, dict],
+    ):
         """Add manifest.json to the archive."""
         manifest = {
             "name": self.manifest.name,
@@ -114,16 +283,17 @@ class ArchiveExporter(Exporter):
             "description": self.manifest.description,
             "license": self.manifest.license,
             "homepage": self.manifest.homepage,
-            "dependencies": self.manifest.get_all_dependencies(),
+            "dependencies": deps,
             "files": file_list,
-            "created": datetime.utcnow().isoformat() + "Z",
+            "checksums": checksums,
+            "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
             "format": "vfx-bootstrap-archive-v1",
         }
 
-        manifest_json = json.dumps(manifest, indent=2)
-        zf.writestr(f"{root_dir}/manifest.json", manifest_json)
+        manifest_json = _dump_json(manifest)
+        self._add_metadata_file(zf, f"{root_dir}/manifest.json", manifest_json)
 
-    def _add_readme(self, zf: zipfile.ZipFile, root_dir: str):
+    def _add_readme(self, zf: zipfile.ZipFile, root_dir: str, deps: List[str]):
         """Add a README file to the archive."""
         readme = f"""# {self.manifest.name} {self.manifest.version}
 
@@ -136,7 +306,7 @@ Extract this archive to your desired installation location.
 ## Dependencies
 
 This package requires the following dependencies:
-{chr(10).join(f"- {dep}" for dep in self.manifest.get_all_dependencies())}
+{chr(10).join(f"- {dep}" for dep in deps)}
 
 ## License
 
@@ -149,4 +319,12 @@ Homepage: {self.manifest.homepage}
 ---
 Packaged with vfx-bootstrap
 """
-        zf.writestr(f"{root_dir}/README.txt", readme)
+        self._add_metadata_file(zf, f"{root_dir}/README.txt", readme)
+
+    @staticmethod
+    def _add_metadata_file(zf: zipfile.ZipFile, name: str, text: Union[str, bytes]):
+        """Add a small generated file, stored uncompressed with a fixed mtime."""
+        zinfo = zipfile.ZipInfo(name, date_time=_METADATA_DATE_TIME)
+        # Deflating a few KiB of text costs more than it saves
+        zinfo.compress_type = zipfile.ZIP_STORED
+        zf.writestr(zinfo, text)
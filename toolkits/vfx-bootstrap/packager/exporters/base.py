@@ -2,11 +2,73 @@
 Base exporter interface for vfx-bootstrap packager.
 """
 
+import io
+import json
+import os
+import stat
+import tarfile
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import BinaryIO, List, Optional, Union
 
-from ..schema import PackageManifest
+from .._walk import FileTree, compile_glob, glob_match
+from ..schema import FileMapping, PackageManifest
+
+try:
+    import orjson
+except ImportError:  # optional dependency, see the "fast" extra
+    orjson = None
+
+# Write buffer for package files; compressors otherwise hit the file in small writes
+OUTPUT_BUFFER_SIZE = 8 * 1024 * 1024
+
+# Copy size when tarfile adds file data; its default is 16 KiB per read/write
+TAR_COPY_BUFSIZE = 4 * 1024 * 1024
+
+
+def _dump_json(obj) -> bytes:
+    """Serialize package metadata to indented JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
+
+
+def _add_tar_bytes(tar: tarfile.TarFile, name: str, data: bytes) -> None:
+    """Add an in-memory file to a tarball."""
+    info = tarfile.TarInfo(name=name)
+    info.size = len(data)
+    # BytesIO shares the buffer, and tarfile reads it back in TAR_COPY_BUFSIZE chunks
+    tar.addfile(info, io.BytesIO(data))
+
+
+def _file_tarinfo(src_path: str, arcname: str) -> tarfile.TarInfo:
+    """
+    Tar header for a regular file or symlink, from a single lstat.
+
+    Unlike TarFile.gettarinfo this does no pwd/grp lookups: members are owned
+    by uid/gid 0 with empty user and group names, as packages don't carry
+    host ownership. Hard links are stored as regular files.
+    """
+    st = os.lstat(src_path)
+    info = tarfile.TarInfo(arcname)
+    info.mode = stat.S_IMODE(st.st_mode)
+    info.mtime = st.st_mtime
+    if stat.S_ISLNK(st.st_mode):
+        info.type = tarfile.SYMTYPE
+        info.linkname = os.readlink(src_path)
+    else:
+        info.size = st.st_size
+    return info
+
+
+def _add_tar_file(tar: tarfile.TarFile, src_path: str, arcname: str) -> None:
+    """Add a regular file or symlink to a tarball, with a _file_tarinfo header."""
+    info = _file_tarinfo(src_path, arcname)
+    if info.isreg():
+        with open(src_path, "rb") as f:
+            tar.addfile(info, f)
+    else:
+        tar.addfile(info)
 
 
 class Exporter(ABC):
@@ -61,8 +123,16 @@ class Exporter(ABC):
         """Generate output filename for the package."""
         return f"{self.manifest.name}-{self.manifest.version}{self.file_extension}"
 
+    def _open_output(self, output_file: Path) -> BinaryIO:
+        """Open a package file for writing, with a large write buffer."""
+        return open(output_file, "wb", buffering=OUTPUT_BUFFER_SIZE)
+
     def validate_source(
-        self, source_dir: Path, components: Optional[List[str]] = None
+        self,
+        source_dir: Path,
+        components: Optional[List[str]] = None,
+        files: Optional[List[FileMapping]] = None,
+        tree: Optional[FileTree] = None,
     ) -> List[str]:
         """
         Validate that all required files exist in source directory.
@@ -70,24 +140,40 @@ class Exporter(ABC):
         Args:
             source_dir: Directory containing built files.
             components: Components to validate.
+            files: File mappings to validate, if already computed from components.
+            tree: Listing of source_dir, if the caller already has one.
 
         Returns:
             List of missing files.
         """
-        files = self.manifest.get_all_files(components)
+        if files is None:
+            files = self.manifest.get_all_files(components)
         missing = []
+        if not files:
+            return missing
+
+        # Membership tests against one walk, instead of a stat or glob per mapping
+        if tree is None:
+            tree = FileTree(source_dir)
+        all_paths = set(tree.files)
+        all_paths.update(tree.dirs)
 
         for file_mapping in files:
+            if file_mapping.optional:
+                continue
+
             # Handle glob patterns
             if "*" in file_mapping.src:
-                import glob
-
-                matches = list(source_dir.glob(file_mapping.src))
-                if not matches and not file_mapping.optional:
-                    missing.append(file_mapping.src)
+                pattern = compile_glob(file_mapping.src)
+                found = bool(tree.glob(file_mapping.src)) or any(
+                    glob_match(pattern, d) for d in tree.dirs
+                )
             else:
-                src_path = source_dir / file_mapping.src
-                if not src_path.exists() and not file_mapping.optional:
-                    missing.append(file_mapping.src)
+                src = os.path.normpath(file_mapping.src).replace(os.sep, "/")
+                # Fall back to a stat for paths the walk can't see (symlinked dirs)
+                found = src in all_paths or (source_dir / file_mapping.src).exists()
+
+            if not found:
+                missing.append(file_mapping.src)
 
         return missing
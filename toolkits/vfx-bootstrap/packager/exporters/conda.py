@@ -2,14 +2,26 @@
 Conda package exporter for vfx-bootstrap.
 """
 
-import json
 import os
 import tarfile
+import time
+import zipfile
 from pathlib import Path
 from typing import List, Optional, Union
 
+from .._walk import FileTree
 from ..schema import PackageManifest
-from .base import Exporter
+from .base import TAR_COPY_BUFSIZE, Exporter, _add_tar_bytes, _add_tar_file, _dump_json
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, see the "fast" extra
+    zstandard = None
+
+# Compression level for the .conda inner tarballs, as conda-build uses
+ZSTD_COMPRESSLEVEL = 3
+
+COMPRESSIONS = ("zstd", "bz2")
 
 
 class CondaExporter(Exporter):
@@ -19,13 +31,32 @@ class CondaExporter(Exporter):
     Creates .conda or .tar.bz2 packages compatible with conda channels.
     """
 
+    def __init__(self, manifest: PackageManifest, compression: str = "zstd"):
+        """
+        Initialize the exporter.
+
+        Args:
+            manifest: Package manifest to export.
+            compression: "zstd" for a .conda package, or "bz2" for a .tar.bz2
+                one. zstd falls back to bz2 when zstandard is not installed.
+
+        Raises:
+            ValueError: If compression is not a supported method.
+        """
+        super().__init__(manifest)
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            compression = "bz2"
+        self.compression = compression
+
     @property
     def format_name(self) -> str:
         return "conda"
 
     @property
     def file_extension(self) -> str:
-        return ".tar.bz2"
+        return ".conda" if self.compression == "zstd" else ".tar.bz2"
 
     def export(
         self,
@@ -42,14 +73,18 @@ class CondaExporter(Exporter):
             components: Specific components to include.
 
         Returns:
-            Path to the exported .tar.bz2 package.
+            Path to the exported .conda or .tar.bz2 package.
         """
         source_dir = Path(source_dir)
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
+        # One walk of the source tree, shared by validation and every mapping
+        files = self.manifest.get_all_files(components)
+        tree = FileTree(source_dir)
+
         # Validate source
-        missing = self.validate_source(source_dir, components)
+        missing = self.validate_source(source_dir, files=files, tree=tree)
         if missing:
             raise FileNotFoundError(f"Missing files: {missing}")
 
@@ -67,38 +102,76 @@ class CondaExporter(Exporter):
 
         # Create package filename
         pkg_name = f"{self.manifest.name}-{self.manifest.version}-py311_0"
-        output_file = output_dir / subdir / f"{pkg_name}.tar.bz2"
+        output_file = output_dir / subdir / f"{pkg_name}{self.file_extension}"
         output_file.parent.mkdir(parents=True, exist_ok=True)
 
+        if self.compression == "zstd":
+            self._export_conda(output_file, pkg_name, source_dir, files, tree)
+            return output_file
+
         # Create package archive
-        with tarfile.open(output_file, "w:bz2") as tar:
+        with (
+            self._open_output(output_file) as out,
+            tarfile.open(fileobj=out, mode="w:bz2", copybufsize=TAR_COPY_BUFSIZE) as tar,
+        ):
             # Add files
-            files = self.manifest.get_all_files(components)
             for file_mapping in files:
-                self._add_files_to_tar(tar, source_dir, file_mapping)
+                self._add_files_to_tar(tar, source_dir, file_mapping, tree)
 
             # Add conda metadata
             self._add_metadata(tar)
 
         return output_file
 
-    def _add_files_to_tar(self, tar: tarfile.TarFile, source_dir: Path, file_mapping):
+    def _export_conda(
+        self, output_file: Path, pkg_name: str, source_dir: Path, files, tree: FileTree
+    ):
+        """
+        Write a .conda package: an uncompressed ZIP of zstd-compressed tarballs.
+
+        Args:
+            output_file: Path of the package to create.
+            pkg_name: Package file name without extension.
+            source_dir: Directory containing built files.
+            files: File mappings to package.
+            tree: Listing of source_dir.
+        """
+        compressor = zstandard.ZstdCompressor(level=ZSTD_COMPRESSLEVEL, threads=-1)
+        with self._open_output(output_file) as out, zipfile.ZipFile(out, "w") as zf:
+            zf.writestr("metadata.json", _dump_json({"conda_pkg_format_version": 2}))
+
+            # Package files, then the info/ metadata, each streamed into its member
+            for prefix in ("pkg", "info"):
+                with zf.open(f"{prefix}-{pkg_name}.tar.zst", "w", force_zip64=True) as member:
+                    with compressor.stream_writer(member, closefd=False) as zst:
+                        with tarfile.open(
+                            fileobj=zst, mode="w|", copybufsize=TAR_COPY_BUFSIZE
+                        ) as tar:
+                            if prefix == "pkg":
+                                for file_mapping in files:
+                                    self._add_files_to_tar(tar, source_dir, file_mapping, tree)
+                            else:
+                                self._add_metadata(tar)
+
+    def _add_files_to_tar(
+        self, tar: tarfile.TarFile, source_dir: Path, file_mapping, tree: FileTree
+    ):
         """Add files matching a mapping to the tarball."""
         if "*" in file_mapping.src:
-            for src_path in source_dir.glob(file_mapping.src):
-                if src_path.is_file():
-                    rel_path = src_path.relative_to(source_dir)
-                    dst_path = file_mapping.dst.rstrip("/") + "/" + src_path.name
-                    tar.add(src_path, arcname=dst_path)
+            for src_path, _ in tree.glob(file_mapping.src):
+                dst_path = file_mapping.dst.rstrip("/") + "/" + os.path.basename(src_path)
+                _add_tar_file(tar, src_path, dst_path)
         else:
             src_path = source_dir / file_mapping.src
-            if src_path.exists():
-                tar.add(src_path, arcname=file_mapping.dst.rstrip("/") + "/" + src_path.name)
+            dst_path = file_mapping.dst.rstrip("/") + "/" + src_path.name
+            if src_path.is_file():
+                _add_tar_file(tar, str(src_path), dst_path)
+            elif src_path.is_dir():
+                for item, rel in tree.walk(file_mapping.src):
+                    _add_tar_file(tar, item, f"{dst_path}/{rel}")
 
     def _add_metadata(self, tar: tarfile.TarFile):
         """Add conda metadata files to the package."""
-        import io
-
         # index.json
         index = {
             "name": self.manifest.name,
@@ -107,13 +180,10 @@ class CondaExporter(Exporter):
             "build_number": 0,
             "depends": self.manifest.get_all_dependencies(),
             "license": self.manifest.license,
-            "timestamp": int(os.time() * 1000) if hasattr(os, "time") else 0,
+            "timestamp": time.time_ns() // 1_000_000,
         }
 
-        index_json = json.dumps(index, indent=2).encode()
-        info = tarfile.TarInfo(name="info/index.json")
-        info.size = len(index_json)
-        tar.addfile(info, io.BytesIO(index_json))
+        _add_tar_bytes(tar, "info/index.json", _dump_json(index))
 
         # about.json
         about = {
@@ -122,7 +192,4 @@ class CondaExporter(Exporter):
             "license": self.manifest.license,
         }
 
-        about_json = json.dumps(about, indent=2).encode()
-        info = tarfile.TarInfo(name="info/about.json")
-        info.size = len(about_json)
-        tar.addfile(info, io.BytesIO(about_json))
+        _add_tar_bytes(tar, "info/about.json", _dump_json(about))
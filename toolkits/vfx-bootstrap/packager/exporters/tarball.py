@@ -2,14 +2,47 @@
 Tarball exporter for vfx-bootstrap.
 """
 
-import json
+import io
+import os
+import shutil
+import subprocess
 import tarfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Iterator, List, Optional, Tuple, Union
 
+from .._walk import FileTree
 from ..schema import PackageManifest
-from .base import Exporter
+from .base import (
+    OUTPUT_BUFFER_SIZE,
+    TAR_COPY_BUFSIZE,
+    Exporter,
+    _add_tar_bytes,
+    _add_tar_file,
+    _dump_json,
+    _file_tarinfo,
+)
+
+# Gzip level for tarballs; tarfile defaults to 9, which is much slower for a
+# marginally smaller file
+TAR_COMPRESSLEVEL = 6
+
+# Headers are made, and files below this size read, on worker threads ahead of
+# the tar writer; larger files are streamed from disk by the writer itself
+_PREREAD_MAX_SIZE = 1024 * 1024
+
+
+def _read_entry(src_path: str, arcname: str) -> Tuple[tarfile.TarInfo, Optional[bytes]]:
+    """A file's tar header, plus its data when small enough to add from memory."""
+    info = _file_tarinfo(src_path, arcname)
+    data = None
+    if info.isreg() and info.size < _PREREAD_MAX_SIZE:
+        with open(src_path, "rb") as f:
+            data = f.read()
+    return info, data
 
 
 class TarballExporter(Exporter):
@@ -49,64 +82,137 @@ class TarballExporter(Exporter):
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
+        # One walk of the source tree, shared by validation and every mapping
+        files = self.manifest.get_all_files(components)
+        tree = FileTree(source_dir)
+
         # Validate source
-        missing = self.validate_source(source_dir, components)
+        missing = self.validate_source(source_dir, files=files, tree=tree)
         if missing:
             raise FileNotFoundError(f"Missing files: {missing}")
 
         output_file = output_dir / self.get_output_filename()
 
         # Create tarball
-        with tarfile.open(output_file, "w:gz") as tar:
+        with self._open_tar(output_file) as tar:
             # Add a top-level directory with package name
             root_dir = f"{self.manifest.name}-{self.manifest.version}"
 
             # Add files
-            files = self.manifest.get_all_files(components)
-            file_list = []
-
+            entries = []
             for file_mapping in files:
-                added = self._add_files_to_tar(tar, source_dir, file_mapping, root_dir)
-                file_list.extend(added)
+                entries.extend(self._collect_files(source_dir, file_mapping, root_dir, tree))
+            self._add_files_to_tar(tar, entries)
+            file_list = [dst for _, dst in entries]
 
             # Add manifest
             self._add_manifest(tar, root_dir, file_list)
 
         return output_file
 
-    def _add_files_to_tar(
-        self, tar: tarfile.TarFile, source_dir: Path, file_mapping, root_dir: str
-    ) -> List[str]:
-        """Add files matching a mapping to the tarball."""
+    @contextmanager
+    def _open_tar(self, output_file: Path) -> Iterator[tarfile.TarFile]:
+        """
+        Open the output tarball for writing.
+
+        Gzip runs single-threaded inside tarfile, so when pigz is installed the
+        tar stream is piped through it to compress on every core instead.
+
+        Args:
+            output_file: Path of the .tar.gz to create.
+
+        Yields:
+            TarFile to add members to.
+
+        Raises:
+            RuntimeError: If pigz fails.
+        """
+        pigz = shutil.which("pigz")
+        if pigz is None:
+            with (
+                self._open_output(output_file) as out,
+                tarfile.open(
+                    fileobj=out,
+                    mode="w:gz",
+                    compresslevel=TAR_COMPRESSLEVEL,
+                    copybufsize=TAR_COPY_BUFSIZE,
+                ) as tar,
+            ):
+                yield tar
+            return
+
+        cmd = [pigz, "-c", f"-{TAR_COMPRESSLEVEL}", "-p", str(os.cpu_count() or 1)]
+        # pigz writes to the file descriptor itself, so no Python-side buffer
+        with open(output_file, "wb") as out:
+            proc = subprocess.Popen(
+                cmd, stdin=subprocess.PIPE, stdout=out, bufsize=OUTPUT_BUFFER_SIZE
+            )
+            try:
+                with tarfile.open(
+                    fileobj=proc.stdin, mode="w|", copybufsize=TAR_COPY_BUFSIZE
+                ) as tar:
+                    yield tar
+            finally:
+                proc.stdin.close()
+                returncode = proc.wait()
+        if returncode != 0:
+            raise RuntimeError(f"pigz failed with exit code {returncode}")
+
+    def _collect_files(
+        self, source_dir: Path, file_mapping, root_dir: str, tree: FileTree
+    ) -> List[Tuple[str, str]]:
+        """List (source path, archive name) pairs for the files matching a mapping."""
         added_files = []
 
         if "*" in file_mapping.src:
-            for src_path in source_dir.glob(file_mapping.src):
-                if src_path.is_file():
-                    dst = f"{root_dir}/{file_mapping.dst.rstrip('/')}/{src_path.name}"
-                    tar.add(src_path, arcname=dst)
-                    added_files.append(dst)
+            for src_path, _ in tree.glob(file_mapping.src):
+                dst = f"{root_dir}/{file_mapping.dst.rstrip('/')}/{os.path.basename(src_path)}"
+                added_files.append((src_path, dst))
         else:
             src_path = source_dir / file_mapping.src
             if src_path.exists():
                 if src_path.is_file():
                     dst = f"{root_dir}/{file_mapping.dst.rstrip('/')}/{src_path.name}"
-                    tar.add(src_path, arcname=dst)
-                    added_files.append(dst)
+                    added_files.append((str(src_path), dst))
                 elif src_path.is_dir():
-                    for item in src_path.rglob("*"):
-                        if item.is_file():
-                            rel = item.relative_to(src_path)
-                            dst = f"{root_dir}/{file_mapping.dst.rstrip('/')}/{rel}"
-                            tar.add(item, arcname=dst)
-                            added_files.append(dst)
+                    for item, rel in tree.walk(file_mapping.src):
+                        dst = f"{root_dir}/{file_mapping.dst.rstrip('/')}/{rel}"
+                        added_files.append((item, dst))
 
         return added_files
 
+    def _add_files_to_tar(self, tar: tarfile.TarFile, entries: List[Tuple[str, str]]) -> None:
+        """Add files to the tarball in order, preparing them ahead in parallel."""
+        workers = os.cpu_count() or 1
+        if workers == 1 or len(entries) < 2:
+            for src_path, dst in entries:
+                _add_tar_file(tar, src_path, dst)
+            return
+
+        def flush(item: Tuple[str, Future]) -> None:
+            src_path, future = item
+            info, data = future.result()
+            if data is not None:
+                tar.addfile(info, io.BytesIO(data))
+            elif info.isreg():
+                with open(src_path, "rb") as f:
+                    tar.addfile(info, f)
+            else:
+                # Symlinks carry no data
+                tar.addfile(info)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Bounded window of in-flight files, so memory stays flat
+            window = deque()
+            for src_path, dst in entries:
+                window.append((src_path, pool.submit(_read_entry, src_path, dst)))
+                if len(window) > 2 * workers:
+                    flush(window.popleft())
+            while window:
+                flush(window.popleft())
+
     def _add_manifest(self, tar: tarfile.TarFile, root_dir: str, file_list: List[str]):
         """Add manifest.json to the tarball."""
-        import io
-
         manifest = {
             "name": self.manifest.name,
             "version": self.manifest.version,
@@ -119,7 +225,4 @@ class TarballExporter(Exporter):
             "format": "vfx-bootstrap-tarball-v1",
         }
 
-        manifest_json = json.dumps(manifest, indent=2).encode()
-        info = tarfile.TarInfo(name=f"{root_dir}/manifest.json")
-        info.size = len(manifest_json)
-        tar.addfile(info, io.BytesIO(manifest_json))
+        _add_tar_bytes(tar, f"{root_dir}/manifest.json", _dump_json(manifest))
@@ -11,8 +11,16 @@ from typing import Dict, List, Optional, Union
 
 import yaml
 
+try:
+    # libyaml C bindings, several times faster than the pure-Python parser
+    from yaml import CSafeDumper as _SafeDumper
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeDumper as _SafeDumper
+    from yaml import SafeLoader as _SafeLoader
 
-@dataclass
+
+@dataclass(slots=True)
 class FileMapping:
     """Mapping of source file to destination in package."""
 
@@ -39,7 +47,7 @@ class FileMapping:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Component:
     """A component within a package."""
 
@@ -69,7 +77,7 @@ class Component:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class PackageManifest:
     """
     Package manifest defining contents and metadata.
@@ -98,7 +106,9 @@ class PackageManifest:
         }
 
     def to_yaml(self) -> str:
-        return yaml.dump(self.to_dict(), default_flow_style=False, sort_keys=False)
+        return yaml.dump(
+            self.to_dict(), Dumper=_SafeDumper, default_flow_style=False, sort_keys=False
+        )
 
     def save(self, path: Union[str, Path]) -> None:
         path = Path(path)
@@ -118,36 +128,33 @@ class PackageManifest:
 
     @classmethod
     def from_yaml(cls, yaml_str: str) -> "PackageManifest":
-        data = yaml.safe_load(yaml_str)
+        data = yaml.load(yaml_str, Loader=_SafeLoader)
         return cls.from_dict(data)
 
     @classmethod
     def load(cls, path: Union[str, Path]) -> "PackageManifest":
         path = Path(path)
-        return cls.from_yaml(path.read_text())
+        # Bytes go to the parser as-is, without a separate decode to str
+        return cls.from_dict(yaml.load(path.read_bytes(), Loader=_SafeLoader))
 
-    def get_all_dependencies(self, component_names: Optional[List[str]] = None) -> List[str]:
-        """Get all unique dependencies for specified components."""
+    def _select_components(self, component_names: Optional[List[str]]) -> List[Component]:
+        """Components by name, or all non-optional components for None."""
         if component_names is None:
-            # All non-optional components
-            components = [c for c in self.components if not c.optional]
-        else:
-            components = [c for c in self.components if c.name in component_names]
+            return [c for c in self.components if not c.optional]
+        names = set(component_names)
+        return [c for c in self.components if c.name in names]
 
+    def get_all_dependencies(self, component_names: Optional[List[str]] = None) -> List[str]:
+        """Get all unique dependencies for specified components."""
         deps = set()
-        for comp in components:
+        for comp in self._select_components(component_names):
             deps.update(comp.dependencies)
         return sorted(deps)
 
     def get_all_files(self, component_names: Optional[List[str]] = None) -> List[FileMapping]:
         """Get all file mappings for specified components."""
-        if component_names is None:
-            components = [c for c in self.components if not c.optional]
-        else:
-            components = [c for c in self.components if c.name in component_names]
-
         files = []
-        for comp in components:
+        for comp in self._select_components(component_names):
             files.extend(comp.files)
         return files
 
@@ -10,76 +10,124 @@ Usage: python fix_pluginfo.py <LIBRARY_PREFIX>
 import sys
 import os
 import json
-import glob
+from concurrent.futures import ThreadPoolExecutor
 
 library_prefix = sys.argv[1]
 lib_usd = os.path.join(library_prefix, 'lib', 'usd')
 plugin_usd = os.path.join(library_prefix, 'plugin', 'usd')
 bin_dir = os.path.join(library_prefix, 'bin')
+# Normalized once, for _bin_relpath's string arithmetic
+prefix_norm = os.path.normpath(library_prefix) + os.sep
 
 if not os.path.isdir(lib_usd):
     print(f"WARNING: {lib_usd} not found, skipping plugInfo.json fixup")
     sys.exit(0)
 
-fixed = 0
-skipped = 0
 
-for search_dir in [lib_usd, plugin_usd]:
-    if not os.path.isdir(search_dir):
-        continue
-    for path in glob.glob(os.path.join(search_dir, '**', 'plugInfo.json'), recursive=True):
-        with open(path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        if not content.strip():
-            continue  # empty file — schema-only plugin, no DLL reference
-
-        try:
-            data = json.loads(content)
-        except json.JSONDecodeError:
-            print(f"WARNING: invalid JSON in {path}, skipping")
+def _iter_pluginfo(root):
+    """Yield plugInfo.json paths under root, walking with os.scandir."""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name == 'plugInfo.json':
+                    yield entry.path
+
+
+def _bin_relpath(plugin_root, dll_name):
+    """os.path.relpath(bin_dir/dll_name, plugin_root), '/'-separated."""
+    # plugin_root is normalized; below the prefix and outside bin/, the path
+    # is a '../' per directory level, without relpath's getcwd and splitting
+    if plugin_root.startswith(prefix_norm):
+        parts = plugin_root[len(prefix_norm):].split(os.sep)
+        if parts[0] and parts[0] != 'bin':
+            return '../' * len(parts) + 'bin/' + dll_name
+    bin_dll = os.path.join(bin_dir, dll_name)
+    return os.path.relpath(bin_dll, plugin_root).replace('\\', '/')
+
+
+def _fixup_one(path):
+    """
+    Point a plugInfo.json's DLL LibraryPaths at bin/.
+
+    Returns (updated, skip count, messages); messages are printed by the
+    caller so output stays in a deterministic order.
+    """
+    messages = []
+    skipped = 0
+    with open(path, 'rb') as f:
+        content = f.read()
+
+    if b'LibraryPath' not in content or b'.dll' not in content:
+        # Nothing to fix, including empty schema-only plugins; skip the parse
+        return False, 0, messages
+
+    try:
+        data = json.loads(content)
+    except ValueError:  # json.JSONDecodeError, or bytes that aren't UTF-8
+        messages.append(f"WARNING: invalid JSON in {path}, skipping")
+        return False, 1, messages
+
+    plugins = data.get('Plugins', [])
+    if not plugins:
+        return False, 0, messages
+
+    resources_dir = os.path.dirname(path)
+    changed = False
+
+    for plugin in plugins:
+        lib_path = plugin.get('LibraryPath', '')
+        if not lib_path or not lib_path.endswith('.dll'):
+            continue
+
+        root_rel = plugin.get('Root', '.')
+        plugin_root = os.path.normpath(os.path.join(resources_dir, root_rel))
+        # lib_path ends in a file name, so no normalization is needed for it
+        dll_name = os.path.basename(lib_path)
+
+        bin_dll = os.path.join(bin_dir, dll_name)
+        if not os.path.exists(bin_dll):
+            # Check if the DLL is next to the plugInfo.json (plugin-dir layout)
+            local_dll = os.path.join(os.path.dirname(path), '..', dll_name)
+            local_dll = os.path.normpath(local_dll)
+            if os.path.exists(local_dll):
+                continue  # DLL is local to the plugin dir, leave as-is
+            messages.append(f"WARNING: {dll_name} not found in bin/ or plugin dir, skipping")
             skipped += 1
             continue
 
-        plugins = data.get('Plugins', [])
-        if not plugins:
+        new_rel = _bin_relpath(plugin_root, dll_name)
+        if new_rel == lib_path:
             continue
 
-        resources_dir = os.path.dirname(path)
-        changed = False
-
-        for plugin in plugins:
-            lib_path = plugin.get('LibraryPath', '')
-            if not lib_path or not lib_path.endswith('.dll'):
-                continue
-
-            root_rel = plugin.get('Root', '.')
-            plugin_root = os.path.normpath(os.path.join(resources_dir, root_rel))
-            abs_lib = os.path.normpath(os.path.join(plugin_root, lib_path))
-            dll_name = os.path.basename(abs_lib)
-
-            bin_dll = os.path.join(bin_dir, dll_name)
-            if not os.path.exists(bin_dll):
-                # Check if the DLL is next to the plugInfo.json (plugin-dir layout)
-                local_dll = os.path.join(os.path.dirname(path), '..', dll_name)
-                local_dll = os.path.normpath(local_dll)
-                if os.path.exists(local_dll):
-                    continue  # DLL is local to the plugin dir, leave as-is
-                print(f"WARNING: {dll_name} not found in bin/ or plugin dir, skipping")
-                skipped += 1
-                continue
-
-            new_rel = os.path.relpath(bin_dll, plugin_root).replace('\\', '/')
-            if new_rel == lib_path:
-                continue
-
-            print(f"  {plugin.get('Name', dll_name)}: {lib_path!r} -> {new_rel!r}")
-            plugin['LibraryPath'] = new_rel
-            changed = True
-
-        if changed:
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4)
-            fixed += 1
+        messages.append(f"  {plugin.get('Name', dll_name)}: {lib_path!r} -> {new_rel!r}")
+        plugin['LibraryPath'] = new_rel
+        changed = True
+
+    if changed:
+        # One write of the serialized file; json.dump writes token by token
+        output = json.dumps(data, indent=4).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(output)
+    return changed, skipped, messages
+
+
+paths = []
+for search_dir in [lib_usd, plugin_usd]:
+    if os.path.isdir(search_dir):
+        paths.extend(_iter_pluginfo(search_dir))
+
+fixed = 0
+skipped = 0
+
+# The fixups are independent file I/O, so overlap them on a thread pool
+with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as pool:
+    for updated, skip_count, messages in pool.map(_fixup_one, paths):
+        for message in messages:
+            print(message)
+        fixed += updated
+        skipped += skip_count
 
 print(f"plugInfo.json fixup: {fixed} files updated, {skipped} skipped")
@@ -30,9 +30,16 @@ setup(
         "requests>=2.28",
     ],
     extras_require={
+        "fast": [
+            "blake3>=0.4",
+            "orjson>=3.0",
+            "xxhash>=3.0",
+            "zstandard>=0.15",
+        ],
         "dev": [
             "pytest>=7.0",
             "pytest-cov>=4.0",
+            "pytest-xdist>=3.0",
             "black>=23.0",
             "isort>=5.0",
             "mypy>=1.0",
@@ -2,6 +2,7 @@
 Tests for the vfx-bootstrap builder module.
 """
 
+import shutil
 import tempfile
 from pathlib import Path
 
@@ -78,6 +79,182 @@ class TestVFXBuilder:
         order = builder.resolve_build_order(["lib", "base"])
         assert order.index("base") < order.index("lib")
 
+        # Dependencies are pulled in even when not targeted
+        assert builder.resolve_build_order(["lib"]) == ["base", "lib"]
+
+        # Repeated calls are served from the cache and return fresh lists
+        builder.resolve_build_order(["lib"]).clear()
+        assert builder.resolve_build_order(["lib"]) == ["base", "lib"]
+
+    def test_parse_recipe_dependencies(self, tmp_path):
+        """Test dependency extraction from meta.yaml list items."""
+        from builder import VFXBuilder
+
+        recipes_dir = tmp_path / "recipes"
+        for name in ("boost", "draco", "imath", "ptex", "tbb", "usd"):
+            (recipes_dir / name).mkdir(parents=True)
+            (recipes_dir / name / "meta.yaml").write_text(f"package:\n  name: {name}")
+        (recipes_dir / "usd" / "meta.yaml").write_text(
+            "requirements:\n"
+            "  build:\n"
+            "    - {{ compiler('cxx') }}\n"
+            "  host:\n"
+            "    - boost >=1.82\n"
+            "    - imath=3.1\n"
+            "    - ptex~=2.4\n"
+            "    - draco!=1.5.0\n"
+            "    - python\n"
+            "  run:\n"
+            "    -   tbb  # [linux]\n"
+        )
+
+        builder = VFXBuilder(recipes_dir=recipes_dir, output_dir=tmp_path / "output")
+
+        assert builder.dependencies["usd"] == {"boost", "draco", "imath", "ptex", "tbb"}
+        assert isinstance(builder.dependencies["usd"], frozenset)
+
+    def test_resolve_build_order_cycle(self, tmp_path):
+        """Test that a dependency cycle is reported."""
+        from builder import VFXBuilder
+
+        recipes_dir = tmp_path / "recipes"
+        for name, dep in (("liba", "libb"), ("libb", "liba")):
+            (recipes_dir / name).mkdir(parents=True)
+            (recipes_dir / name / "meta.yaml").write_text(
+                f"package:\n  name: {name}\nrequirements:\n  host:\n    - {dep}"
+            )
+
+        builder = VFXBuilder(recipes_dir=recipes_dir, output_dir=tmp_path / "output")
+
+        with pytest.raises(ValueError, match="cycle"):
+            builder.resolve_build_order()
+
+    def test_cli_reports_cycle(self, tmp_path, monkeypatch, capsys):
+        """Test that the order and build commands report a cycle instead of raising."""
+        import sys
+
+        from builder.cli import main
+
+        recipes_dir = tmp_path / "recipes"
+        for name, dep in (("liba", "libb"), ("libb", "liba")):
+            (recipes_dir / name).mkdir(parents=True)
+            (recipes_dir / name / "meta.yaml").write_text(
+                f"package:\n  name: {name}\nrequirements:\n  host:\n    - {dep}"
+            )
+
+        common = [
+            "vfx-bootstrap",
+            "--recipes",
+            str(recipes_dir),
+            "--output",
+            str(tmp_path / "output"),
+            "--channel-dir",
+            str(tmp_path / "channel"),
+        ]
+        for command in (["order"], ["build", "--no-cache"]):
+            monkeypatch.setattr(sys, "argv", common + command)
+            assert main() == 1
+            assert "Error: Dependency cycle between recipes" in capsys.readouterr().out
+
+    def test_dependency_cache(self, tmp_path, monkeypatch):
+        """Test that parsed dependencies are reused until meta.yaml changes."""
+        from builder import VFXBuilder
+
+        recipes_dir = tmp_path / "recipes"
+        for name in ("base", "lib"):
+            (recipes_dir / name).mkdir(parents=True)
+            (recipes_dir / name / "meta.yaml").write_text(f"package:\n  name: {name}")
+        kwargs = dict(
+            recipes_dir=recipes_dir, output_dir=tmp_path / "output", cache_dir=tmp_path / "cache"
+        )
+
+        VFXBuilder(**kwargs)
+        assert (tmp_path / "cache" / "recipe_deps.json").exists()
+
+        def fail(self, recipe_dir):
+            raise AssertionError(f"re-parsed {recipe_dir.name}")
+
+        with monkeypatch.context() as m:
+            m.setattr(VFXBuilder, "_parse_recipe_dependencies", fail)
+            assert VFXBuilder(**kwargs).dependencies == {"base": set(), "lib": set()}
+
+        (recipes_dir / "lib" / "meta.yaml").write_text(
+            "package:\n  name: lib\nrequirements:\n  host:\n    - base"
+        )
+        assert VFXBuilder(**kwargs).dependencies["lib"] == {"base"}
+
+    def test_compute_cache_key(self, tmp_path, monkeypatch):
+        """Test that cache keys depend on the recipe files and platform config."""
+        from builder import VFXBuilder
+        from builder.cache import _recipe_digest
+
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+
+        recipes_dir = tmp_path / "recipes"
+        for name in ("base", "lib"):
+            (recipes_dir / name).mkdir(parents=True)
+            (recipes_dir / name / "meta.yaml").write_text(f"package:\n  name: {name}")
+        (recipes_dir / "conda_build_config.yaml").write_text("python:\n  - '3.11'\n")
+
+        builder = VFXBuilder(recipes_dir=recipes_dir, output_dir=tmp_path / "output")
+        key = builder._compute_cache_key("base")
+        assert key == builder._compute_cache_key("base")
+        assert key != builder._compute_cache_key("lib")
+
+        (recipes_dir / "conda_build_config.yaml").write_text("python:\n  - '3.12'\n")
+        other = VFXBuilder(recipes_dir=recipes_dir, output_dir=tmp_path / "output")
+        assert other._compute_cache_key("base") != key
+
+        # Editing a recipe file invalidates its key
+        other_key = other._compute_cache_key("base")
+        (recipes_dir / "base" / "build.sh").write_text("make install")
+        _recipe_digest.cache_clear()
+        edited = VFXBuilder(recipes_dir=recipes_dir, output_dir=tmp_path / "output")
+        assert edited._compute_cache_key("base") != other_key
+
+    def test_find_build_outputs(self, tmp_path):
+        """Test that build outputs are matched by package name."""
+        from builder import VFXBuilder
+
+        recipes_dir = tmp_path / "recipes"
+        (recipes_dir / "usd").mkdir(parents=True)
+        (recipes_dir / "usd" / "meta.yaml").write_text("package:\n  name: usd")
+
+        output_dir = tmp_path / "output"
+        (output_dir / "linux-64").mkdir(parents=True)
+        (output_dir / "noarch").mkdir()
+        for name in ("usd-24.05-h1234_0.conda", "usd-core-24.05-py311_0.tar.bz2"):
+            (output_dir / "linux-64" / name).touch()
+        (output_dir / "noarch" / "usd-24.05-0.tar.bz2").touch()
+
+        builder = VFXBuilder(recipes_dir=recipes_dir, output_dir=output_dir)
+
+        outputs = builder._find_build_outputs("usd")
+        assert sorted(p.name for p in outputs) == ["usd-24.05-0.tar.bz2", "usd-24.05-h1234_0.conda"]
+        assert [p.name for p in builder._find_build_outputs("usd-core")] == [
+            "usd-core-24.05-py311_0.tar.bz2"
+        ]
+
+    @pytest.mark.skipif(not shutil.which("true"), reason="needs a POSIX `true`")
+    def test_build_all_parallel(self, tmp_path):
+        """Test that parallel builds return results in build order."""
+        from builder import VFXBuilder
+
+        recipes_dir = tmp_path / "recipes"
+        for name, dep in (("base", None), ("lib", "base"), ("tool", None)):
+            (recipes_dir / name).mkdir(parents=True)
+            host = f"\nrequirements:\n  host:\n    - {dep}" if dep else ""
+            (recipes_dir / name / "meta.yaml").write_text(f"package:\n  name: {name}{host}")
+
+        builder = VFXBuilder(
+            recipes_dir=recipes_dir, output_dir=tmp_path / "output", conda_build_exe="true"
+        )
+
+        order = builder.resolve_build_order()
+        results = builder.build_all(use_cache=False, jobs=2)
+        assert [r.recipe for r in results] == order
+        assert all(r.success for r in results)
+
 
 class TestBuildCache:
     """Tests for BuildCache class."""
@@ -120,6 +297,225 @@ class TestBuildCache:
         assert result is not None
         assert len(result) == 1
 
+    def test_put_multiple_packages(self, tmp_path):
+        """Test that packages stored in parallel keep their input order."""
+        from builder import BuildCache
+
+        cache = BuildCache(tmp_path / "cache")
+
+        names = ["zlib-1.3-0.tar.bz2", "abc-1.0-0.tar.bz2", "mid-2.0-0.conda"]
+        packages = []
+        for name in names:
+            pkg_file = tmp_path / name
+            pkg_file.write_bytes(name.encode() * 100)
+            packages.append(pkg_file)
+        cache.put("test_key_123", packages)
+
+        result = cache.get("test_key_123")
+        assert [p.name for p in result] == names
+        assert all(p.read_bytes() == p.name.encode() * 100 for p in result)
+
+    def test_get_incomplete_entry(self, tmp_path):
+        """Test that an entry missing a package file is a cache miss."""
+        from builder import BuildCache
+
+        cache = BuildCache(tmp_path / "cache")
+
+        pkg_file = tmp_path / "test-1.0-py311_0.tar.bz2"
+        pkg_file.write_bytes(b"test package content")
+        cache.put("test_key_123", [pkg_file])
+
+        (cache.cache / "test_key_123" / pkg_file.name).unlink()
+        assert cache.get("test_key_123") is None
+
+    def test_get_overwritten_hardlink(self, tmp_path):
+        """Test that a hardlinked entry rewritten through the output file is a miss."""
+        from builder import BuildCache
+
+        cache = BuildCache(tmp_path / "cache")
+
+        pkg_file = tmp_path / "test-1.0-py311_0.tar.bz2"
+        pkg_file.write_bytes(b"test package content")
+        cache.put("test_key_123", [pkg_file])
+        if pkg_file.stat().st_nlink == 1:
+            pytest.skip("Filesystem doesn't support hardlinks")
+        assert cache.get("test_key_123") is not None
+
+        # A rebuild under the same filename truncates and rewrites the shared inode
+        with open(pkg_file, "wb") as f:
+            f.write(b"rebuilt package content")
+        assert cache.get("test_key_123") is None
+
+    def test_get_hardlinked_entry_without_hashing(self, tmp_path, monkeypatch):
+        """Test that hits on an unchanged hardlinked entry only stat it."""
+        import hashlib
+        import json
+        import os
+
+        from builder import BuildCache
+
+        cache = BuildCache(tmp_path / "cache")
+
+        pkg_file = tmp_path / "test-1.0-py311_0.tar.bz2"
+        pkg_file.write_bytes(b"test package content")
+        cache.put("test_key_123", [pkg_file])
+        if pkg_file.stat().st_nlink == 1:
+            pytest.skip("Filesystem doesn't support hardlinks")
+
+        calls = []
+        monkeypatch.setattr(BuildCache, "_compute_digest", staticmethod(calls.append))
+        for _ in range(3):
+            assert cache.get("test_key_123") is not None
+        assert calls == []
+
+        # Same bytes but a new mtime: verified with the algorithm that recorded
+        # the entry, even when that isn't the one installed now
+        monkeypatch.undo()
+        meta_file = cache.metadata / "test_key_123.json"
+        meta = json.loads(meta_file.read_text())
+        for algorithm in ("blake3", "md5"):
+            meta["packages"][0].pop(algorithm, None)
+        meta["packages"][0]["md5"] = hashlib.md5(b"test package content").hexdigest()
+        meta_file.write_text(json.dumps(meta))
+        os.utime(pkg_file, ns=(0, 0))
+        assert cache.get("test_key_123") is not None
+
+    def test_cdc_mode_deduplicates(self, tmp_path):
+        """Test that chunked storage round-trips and shares common payloads."""
+        import os
+
+        from builder import BuildCache
+
+        cache = BuildCache(tmp_path / "cache", cache_mode="cdc")
+
+        shared = os.urandom(512 * 1024)
+        pkg_a = tmp_path / "a-1.0-0.conda"
+        pkg_a.write_bytes(os.urandom(1000) + shared)
+        pkg_b = tmp_path / "b-1.0-0.conda"
+        pkg_b.write_bytes(os.urandom(2000) + shared)
+
+        cache.put("key_a", [pkg_a])
+        cache.put("key_b", [pkg_b])
+
+        assert cache.get("key_a")[0].read_bytes() == pkg_a.read_bytes()
+        assert cache.get("key_b")[0].read_bytes() == pkg_b.read_bytes()
+
+        stored = cache.status()["total_size_bytes"]
+        assert stored < pkg_a.stat().st_size + pkg_b.stat().st_size
+
+    def test_cdc_mode_rebuilds_into_dest_dir(self, tmp_path):
+        """Test that chunked entries are rebuilt, verified and cleaned up."""
+        import os
+
+        from builder import BuildCache
+
+        cache = BuildCache(tmp_path / "cache", cache_mode="cdc")
+
+        pkg_file = tmp_path / "linux-64" / "a-1.0-0.conda"
+        pkg_file.parent.mkdir()
+        pkg_file.write_bytes(os.urandom(300 * 1024))
+        cache.put("key_a", [pkg_file])
+
+        # Rebuilt into the caller's directory, under the package's subdir
+        dest = tmp_path / "out"
+        result = cache.get("key_a", dest_dir=dest)
+        assert result == [dest / "linux-64" / "a-1.0-0.conda"]
+        assert result[0].read_bytes() == pkg_file.read_bytes()
+
+        # A damaged copy there is rebuilt rather than reused
+        result[0].write_bytes(b"damaged")
+        assert cache.get("key_a", dest_dir=dest)[0].read_bytes() == pkg_file.read_bytes()
+
+        # Without a destination, the scratch copy goes away with the entry
+        assert cache.get("key_a")[0].is_relative_to(cache.root / "tmp" / "key_a")
+        cache.delete("key_a")
+        assert not (cache.root / "tmp" / "key_a").exists()
+
+    def test_cdc_mode_large_package_stored_whole(self, tmp_path, monkeypatch):
+        """Test that packages over the chunking size limit are stored unchunked."""
+        import builder.cache
+        from builder import BuildCache
+
+        monkeypatch.setattr(builder.cache, "CDC_MAX_PACKAGE_SIZE", 1024)
+        cache = BuildCache(tmp_path / "cache", cache_mode="cdc")
+
+        small = tmp_path / "small-1.0-0.conda"
+        small.write_bytes(b"s" * 100)
+        large = tmp_path / "large-1.0-0.conda"
+        large.write_bytes(b"l" * 4096)
+        cache.put("key", [small, large])
+
+        result = cache.get("key", dest_dir=tmp_path / "out")
+        assert [p.read_bytes() for p in result] == [small.read_bytes(), large.read_bytes()]
+        assert result[1] == cache.root / "packages" / "key" / large.name
+
+    def test_cdc_mode_corrupt_chunk(self, tmp_path):
+        """Test that a chunk whose content doesn't match its digest is a cache miss."""
+        import os
+
+        from builder import BuildCache
+
+        cache = BuildCache(tmp_path / "cache", cache_mode="cdc")
+
+        pkg_file = tmp_path / "a-1.0-0.conda"
+        pkg_file.write_bytes(os.urandom(300 * 1024))
+        cache.put("key_a", [pkg_file])
+
+        chunk = next((cache.root / "chunks").iterdir())
+        chunk.write_bytes(b"x" * chunk.stat().st_size)
+        assert cache.get("key_a", dest_dir=tmp_path / "out") is None
+
+    def test_read_only_access_creates_nothing(self, tmp_path):
+        """Test that lookups on a fresh cache don't create directories."""
+        from builder import BuildCache
+
+        cache_dir = tmp_path / "cache"
+        cache = BuildCache(cache_dir)
+
+        assert cache.get("missing") is None
+        assert cache.status()["num_entries"] == 0
+        assert list(cache.list_entries()) == []
+        assert not cache_dir.exists()
+
+    def test_compute_config_hash(self, tmp_path, monkeypatch):
+        """Test that the config hash tracks recipe contents deterministically."""
+        from builder.cache import _recipe_digest, compute_config_hash
+
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+
+        recipe_dir = tmp_path / "boost"
+        recipe_dir.mkdir()
+        (recipe_dir / "meta.yaml").write_text("package:\n  name: boost")
+        (recipe_dir / "build.sh").write_text("make")
+
+        first = compute_config_hash(recipe_dir, {"python": "3.11"})
+        assert compute_config_hash(recipe_dir, {"python": "3.11"}) == first
+        assert compute_config_hash(recipe_dir, {"python": "3.12"}) != first
+
+        (recipe_dir / "build.sh").write_text("make -j4")
+        assert compute_config_hash(recipe_dir, {"python": "3.11"}) == first  # memoized
+        _recipe_digest.cache_clear()
+        assert compute_config_hash(recipe_dir, {"python": "3.11"}) != first
+        assert (tmp_path / "xdg" / "vfx-bootstrap" / "hash-cache.json").exists()
+
+    def test_hash_cache_pruned(self, tmp_path, monkeypatch):
+        """Test that the digest cache drops missing files and stays bounded."""
+        import builder.cache
+        from builder.cache import _load_hash_cache, _save_hash_cache
+
+        monkeypatch.setattr(builder.cache, "_HASH_CACHE_MAX_ENTRIES", 2)
+
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"file{i}"
+            path.write_text(str(i))
+            paths.append(str(path))
+        files = {p: [1, 0, "00"] for p in [str(tmp_path / "gone")] + paths}
+
+        cache_file = tmp_path / "hash-cache.json"
+        _save_hash_cache(cache_file, files)
+        assert list(_load_hash_cache(cache_file)) == paths[1:]
+
     def test_status(self, tmp_path):
         """Test cache status."""
         from builder import BuildCache
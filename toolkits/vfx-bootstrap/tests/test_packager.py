@@ -2,6 +2,7 @@
 Tests for the vfx-bootstrap packager module.
 """
 
+import shutil
 import tempfile
 from pathlib import Path
 
@@ -99,6 +100,41 @@ license: MIT
         assert "dep3" in deps_with_optional
 
 
+@pytest.fixture(scope="session")
+def conda_source_dir(tmp_path_factory):
+    """Built files shared by the conda exporter tests; treat as read-only."""
+    source_dir = tmp_path_factory.mktemp("conda-source")
+    (source_dir / "lib").mkdir()
+    (source_dir / "lib" / "libtest.so").write_bytes(b"\x7fELF")
+    (source_dir / "include" / "test").mkdir(parents=True)
+    (source_dir / "include" / "test" / "test.h").write_text("#pragma once\n")
+    (source_dir / "LICENSE").write_text("Apache-2.0\n")
+    return source_dir
+
+
+@pytest.fixture
+def in_memory_output(monkeypatch):
+    """Capture packages written through Exporter._open_output, keyed by path."""
+    import io
+
+    from packager.exporters.base import Exporter
+
+    outputs = {}
+
+    class Output(io.BytesIO):
+        def __init__(self, output_file):
+            super().__init__()
+            self.output_file = Path(output_file)
+
+        def close(self):
+            if not self.closed:
+                outputs[self.output_file] = self.getvalue()
+            super().close()
+
+    monkeypatch.setattr(Exporter, "_open_output", lambda self, output_file: Output(output_file))
+    return outputs
+
+
 class TestExporters:
     """Tests for package exporters."""
 
@@ -135,6 +171,77 @@ class TestExporters:
         assert result.exists()
         assert result.suffix == ".gz"
 
+    def test_tarball_exporter_contents(self, tmp_path, monkeypatch):
+        """Test that tarball members keep their order, data and links."""
+        import os
+        import tarfile
+
+        from packager.exporters import TarballExporter, tarball
+        from packager.schema import Component, FileMapping, PackageManifest
+
+        # Files from 4 KiB up are streamed rather than read ahead, without
+        # needing megabytes of test data
+        monkeypatch.setattr(tarball, "_PREREAD_MAX_SIZE", 4096)
+
+        source_dir = tmp_path / "source"
+        (source_dir / "lib").mkdir(parents=True)
+        for i in range(8):
+            (source_dir / "lib" / f"lib{i}.so").write_bytes(bytes([i]) * (i + 1) * 1000)
+        (source_dir / "lib" / "big.so").write_bytes(os.urandom(64 * 1024))
+        os.symlink("lib0.so", source_dir / "lib" / "link.so")
+
+        manifest = PackageManifest(
+            name="test-pkg",
+            version="1.0.0",
+            components=[Component(name="core", files=[FileMapping(src="lib", dst="lib/")])],
+        )
+        result = TarballExporter(manifest).export(source_dir, tmp_path / "output")
+
+        names = sorted(p.name for p in (source_dir / "lib").iterdir())
+        with tarfile.open(result) as tar:
+            members = tar.getmembers()
+            assert [m.name for m in members[:-1]] == [f"test-pkg-1.0.0/lib/{n}" for n in names]
+            assert members[-1].name == "test-pkg-1.0.0/manifest.json"
+            for member in members[:-1]:
+                assert (member.uid, member.gid, member.uname, member.gname) == (0, 0, "", "")
+                src = source_dir / "lib" / os.path.basename(member.name)
+                if member.issym():
+                    assert member.linkname == "lib0.so"
+                else:
+                    assert tar.extractfile(member).read() == src.read_bytes()
+
+    @pytest.mark.skipif(shutil.which("gzip") is None, reason="gzip not installed")
+    def test_tarball_exporter_pigz(self, tmp_path, monkeypatch):
+        """Test that tarballs are compressed through pigz when it is on PATH."""
+        import os
+        import tarfile
+
+        from packager.exporters import TarballExporter
+        from packager.schema import Component, FileMapping, PackageManifest
+
+        # pigz stand-in that records its use and compresses with gzip
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        pigz = bin_dir / "pigz"
+        pigz.write_text(f'#!/bin/sh\ntouch "{tmp_path}/pigz-used"\nexec gzip -c "$2"\n')
+        pigz.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+        source_dir = tmp_path / "source"
+        (source_dir / "bin").mkdir(parents=True)
+        (source_dir / "bin" / "tool").write_text("tool")
+        manifest = PackageManifest(
+            name="test-pkg",
+            version="1.0.0",
+            components=[Component(name="core", files=[FileMapping(src="bin/tool", dst="bin/")])],
+        )
+
+        result = TarballExporter(manifest).export(source_dir, tmp_path / "output")
+
+        assert (tmp_path / "pigz-used").exists()
+        with tarfile.open(result) as tar:
+            assert tar.extractfile("test-pkg-1.0.0/bin/tool").read() == b"tool"
+
     def test_archive_exporter(self, tmp_path):
         """Test ZIP archive exporter."""
         from packager.exporters import ArchiveExporter
@@ -168,6 +275,187 @@ class TestExporters:
         assert result.exists()
         assert result.suffix == ".zip"
 
+    def test_archive_exporter_parallel_matches_sequential(self, tmp_path, monkeypatch):
+        """Test that pre-compressed members round-trip like zf.open() ones."""
+        import os
+        import zipfile
+
+        from packager.exporters import ArchiveExporter, archive
+        from packager.schema import Component, FileMapping, PackageManifest
+
+        if not archive._RAW_WRITE_SUPPORTED:
+            pytest.skip("Pre-compressed writes are disabled on this Python version")
+        monkeypatch.setattr(os, "cpu_count", lambda: 4)
+
+        source_dir = tmp_path / "source"
+        (source_dir / "lib").mkdir(parents=True)
+        for i in range(20):
+            (source_dir / "lib" / f"file{i}.txt").write_bytes(os.urandom(i * 100) + bytes(5000))
+        (source_dir / "lib" / "image.png").write_bytes(os.urandom(3000))
+
+        manifest = PackageManifest(
+            name="test-pkg",
+            version="1.0.0",
+            components=[Component(name="core", files=[FileMapping(src="lib", dst="lib")])],
+        )
+
+        contents = []
+        for raw_write in (True, False):
+            monkeypatch.setattr(archive, "_RAW_WRITE_SUPPORTED", raw_write)
+            result = ArchiveExporter(manifest).export(source_dir, tmp_path / str(raw_write))
+            with zipfile.ZipFile(result) as zf:
+                assert zf.testzip() is None
+                contents.append(
+                    [
+                        (i.filename, i.compress_type, i.CRC, zf.read(i))
+                        for i in zf.infolist()
+                        if not i.filename.endswith("manifest.json")
+                    ]
+                )
+        assert contents[0] == contents[1]
+
+    def test_archive_exporter_stores_compressed_files(self, tmp_path):
+        """Test that already-compressed files are stored without deflate."""
+        import hashlib
+        import json
+        import zipfile
+        import zlib
+
+        from packager.exporters import ArchiveExporter
+        from packager.schema import Component, FileMapping, PackageManifest
+
+        source_dir = tmp_path / "source"
+        (source_dir / "lib").mkdir(parents=True)
+        (source_dir / "lib" / "test.txt").write_text("test content" * 100)
+        (source_dir / "lib" / "image.PNG").write_bytes(b"\x89PNG" + bytes(1000))
+        (source_dir / "lib" / "sub").mkdir()
+        (source_dir / "lib" / "sub" / "nested.txt").write_text("nested")
+
+        manifest = PackageManifest(
+            name="test-pkg",
+            version="1.0.0",
+            components=[Component(name="core", files=[FileMapping(src="lib", dst="lib")])],
+        )
+
+        result = ArchiveExporter(manifest).export(source_dir, tmp_path / "output")
+
+        with zipfile.ZipFile(result) as zf:
+            assert zf.testzip() is None
+            assert zf.getinfo("test-pkg-1.0.0/lib/test.txt").compress_type == zipfile.ZIP_DEFLATED
+            assert zf.getinfo("test-pkg-1.0.0/lib/image.PNG").compress_type == zipfile.ZIP_STORED
+            assert zf.read("test-pkg-1.0.0/lib/test.txt") == b"test content" * 100
+            assert zf.read("test-pkg-1.0.0/lib/sub/nested.txt") == b"nested"
+
+            for name in ("manifest.json", "README.txt"):
+                info = zf.getinfo(f"test-pkg-1.0.0/{name}")
+                assert info.compress_type == zipfile.ZIP_STORED
+                assert info.date_time == (2020, 1, 1, 0, 0, 0)
+
+            checksums = json.loads(zf.read("test-pkg-1.0.0/manifest.json"))["checksums"]
+            assert checksums["test-pkg-1.0.0/lib/sub/nested.txt"] == {
+                "size": 6,
+                "crc32": f"{zlib.crc32(b'nested'):08x}",
+                "sha256": hashlib.sha256(b"nested").hexdigest(),
+            }
+
+    def test_conda_exporter(self, tmp_path, conda_source_dir, in_memory_output):
+        """Test conda exporter with .tar.bz2 output."""
+        import io
+        import json
+        import tarfile
+
+        from packager.exporters import CondaExporter
+        from packager.schema import Component, FileMapping, PackageManifest
+
+        files = [
+            FileMapping(src="lib/*.so", dst="lib/"),
+            FileMapping(src="include/test", dst="include/"),
+            FileMapping(src="LICENSE", dst="info/licenses/"),
+        ]
+        manifest = PackageManifest(
+            name="test-pkg",
+            version="1.0.0",
+            components=[Component(name="core", files=files)],
+        )
+
+        exporter = CondaExporter(manifest, compression="bz2")
+        result = exporter.export(conda_source_dir, tmp_path / "output")
+
+        assert result.name == "test-pkg-1.0.0-py311_0.tar.bz2"
+        assert not result.exists()
+        with tarfile.open(fileobj=io.BytesIO(in_memory_output[result])) as tar:
+            assert tar.extractfile("lib/libtest.so").read() == b"\x7fELF"
+            assert tar.extractfile("include/test/test.h").read() == b"#pragma once\n"
+            assert tar.extractfile("info/licenses/LICENSE").read() == b"Apache-2.0\n"
+            index = json.load(tar.extractfile("info/index.json"))
+            # Ownership doesn't depend on how a mapping was written
+            for member in tar.getmembers():
+                assert (member.uid, member.gid, member.uname, member.gname) == (0, 0, "", "")
+        assert index["name"] == "test-pkg"
+        # Milliseconds since the epoch, as conda expects
+        assert index["timestamp"] > 1_600_000_000_000
+
+        with pytest.raises(ValueError):
+            CondaExporter(manifest, compression="lzma")
+
+    def test_conda_exporter_zstd(self, tmp_path, conda_source_dir, in_memory_output):
+        """Test conda exporter with .conda output."""
+        import io
+        import json
+        import tarfile
+        import zipfile
+
+        zstandard = pytest.importorskip("zstandard")
+        from packager.exporters import CondaExporter
+        from packager.schema import Component, FileMapping, PackageManifest
+
+        manifest = PackageManifest(
+            name="test-pkg",
+            version="1.0.0",
+            components=[Component(name="core", files=[FileMapping(src="lib/*.so", dst="lib/")])],
+        )
+
+        result = CondaExporter(manifest).export(conda_source_dir, tmp_path / "output")
+
+        assert result.name == "test-pkg-1.0.0-py311_0.conda"
+        with zipfile.ZipFile(io.BytesIO(in_memory_output[result])) as zf:
+            assert json.loads(zf.read("metadata.json")) == {"conda_pkg_format_version": 2}
+            members = {}
+            for prefix in ("pkg", "info"):
+                data = zf.read(f"{prefix}-test-pkg-1.0.0-py311_0.tar.zst")
+                raw = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)).read()
+                with tarfile.open(fileobj=io.BytesIO(raw)) as tar:
+                    members[prefix] = tar.getnames()
+        assert members == {
+            "pkg": ["lib/libtest.so"],
+            "info": ["info/index.json", "info/about.json"],
+        }
+
+    def test_file_tree(self, tmp_path):
+        """Test that the shared source listing matches pathlib globbing."""
+        import os
+
+        from packager._walk import FileTree
+
+        for name in ["lib/a.so", "lib/a.txt", "lib/py/b.so", "lib/py/x/c.so", "bin/tool"]:
+            (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / name).touch()
+
+        tree = FileTree(tmp_path)
+        for pattern in ["lib/*.so", "lib/*/*.so", "lib/**/*.so", "*/*"]:
+            expected = sorted(
+                p.relative_to(tmp_path).as_posix() for p in tmp_path.glob(pattern) if p.is_file()
+            )
+            assert [rel for _, rel in tree.glob(pattern)] == expected
+        assert [rel for _, rel in tree.walk("lib/py")] == ["b.so", "x/c.so"]
+        assert tree.walk("missing") == []
+
+        # Directory symlinks are followed by fixed-depth patterns, as with Path.glob
+        os.symlink(tmp_path / "lib", tmp_path / "lib64")
+        tree = FileTree(tmp_path)
+        assert [rel for _, rel in tree.glob("lib64/*.so")] == ["lib64/a.so"]
+        assert [rel for _, rel in tree.walk("lib64")] == ["a.so", "a.txt", "py/b.so", "py/x/c.so"]
+
     def test_validate_source(self, tmp_path):
         """Test source validation."""
         from packager.exporters import TarballExporter
@@ -195,3 +483,31 @@ class TestExporters:
 
         assert len(missing) > 0
         assert "missing/file.txt" in missing
+
+    def test_validate_source_patterns(self, tmp_path):
+        """Test source validation of literal paths and glob patterns."""
+        from packager.exporters import TarballExporter
+        from packager.schema import Component, FileMapping, PackageManifest
+
+        source_dir = tmp_path / "source"
+        (source_dir / "lib" / "python").mkdir(parents=True)
+        (source_dir / "lib" / "python" / "mod.so").touch()
+        (source_dir / "bin").mkdir()
+        (source_dir / "bin" / "tool").touch()
+
+        files = [
+            FileMapping(src="bin/tool", dst="bin/"),
+            FileMapping(src="lib", dst="lib/"),
+            FileMapping(src="lib/*/*.so", dst="lib/"),
+            FileMapping(src="lib/**/*.so", dst="lib/"),
+            FileMapping(src="lib/*.so", dst="lib/"),
+            FileMapping(src="docs/*.md", dst="docs/", optional=True),
+        ]
+        manifest = PackageManifest(
+            name="test", version="1.0", components=[Component(name="core", files=files)]
+        )
+
+        missing = TarballExporter(manifest).validate_source(source_dir)
+
+        # "*" does not cross directories, as with Path.glob
+        assert missing == ["lib/*.so"]
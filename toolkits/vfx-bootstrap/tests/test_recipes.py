@@ -3,77 +3,189 @@ Tests for recipe validation.
 """
 
 import os
+import re
+from functools import lru_cache
 from pathlib import Path
+from typing import NamedTuple, Optional
 
 import pytest
 import yaml
 
+try:
+    # libyaml C bindings, several times faster than the pure-Python parser
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
 RECIPES_DIR = Path(__file__).parent.parent / "recipes"
 
+# Whole-line Jinja2 statements: {% set ... %}, {% if ... %}, ...
+_JINJA_STATEMENT_RE = re.compile(r"^[ \t]*\{%.*%\}[ \t]*\n?", re.M)
+# conda platform selectors: "# [win]", "# [py<311]", ...
+_SELECTOR_RE = re.compile(r"[ \t]*#[ \t]*\[[^\]\n]*\].*$", re.M)
+
 
+@lru_cache(maxsize=1)
 def get_recipe_dirs():
-    """Get all recipe directories."""
+    """Get all recipe directories, scanned once per session."""
     if not RECIPES_DIR.exists():
-        return []
-    return [d for d in RECIPES_DIR.iterdir() if d.is_dir() and (d / "meta.yaml").exists()]
+        return ()
+    # DirEntry.is_dir uses the type from readdir, so only meta.yaml is stat'ed
+    with os.scandir(RECIPES_DIR) as it:
+        return tuple(
+            Path(entry.path)
+            for entry in it
+            if entry.is_dir() and os.path.exists(os.path.join(entry.path, "meta.yaml"))
+        )
 
 
-class TestRecipeStructure:
-    """Tests for recipe structure and validity."""
+def _strip_jinja(content):
+    """Remove Jinja2 templating for basic YAML parsing."""
+    # Drop Jinja2 control lines entirely, then the remaining inline expression braces
+    content = _JINJA_STATEMENT_RE.sub("", content)
+    return content.replace("{{", "").replace("}}", "")
 
-    @pytest.mark.parametrize("recipe_dir", get_recipe_dirs(), ids=lambda d: d.name)
-    def test_recipe_has_meta_yaml(self, recipe_dir):
-        """Test that each recipe has a meta.yaml file."""
-        meta_yaml = recipe_dir / "meta.yaml"
-        assert meta_yaml.exists(), f"Recipe {recipe_dir.name} missing meta.yaml"
 
-    @pytest.mark.parametrize("recipe_dir", get_recipe_dirs(), ids=lambda d: d.name)
-    def test_recipe_meta_yaml_valid(self, recipe_dir):
-        """Test that meta.yaml is valid YAML (basic syntax check)."""
-        meta_yaml = recipe_dir / "meta.yaml"
-        content = meta_yaml.read_text()
-
-        # Remove Jinja2 templating for basic YAML parsing
-        # Remove entire lines with {% ... %} (set statements, conditionals)
-        lines = []
-        for line in content.split("\n"):
-            stripped = line.strip()
-            if stripped.startswith("{%") and stripped.endswith("%}"):
-                continue  # Skip Jinja2 control lines entirely
-            lines.append(line)
-        content = "\n".join(lines)
-
-        # Replace remaining inline Jinja2 expressions
-        content = content.replace("{{", "").replace("}}", "")
+def _strip_selectors(content):
+    """Remove platform selectors for YAML parsing."""
+    return _SELECTOR_RE.sub("", content)
 
-        try:
-            yaml.safe_load(content)
-        except yaml.YAMLError as e:
-            pytest.fail(f"Invalid YAML in {recipe_dir.name}/meta.yaml: {e}")
 
-    @pytest.mark.parametrize("recipe_dir", get_recipe_dirs(), ids=lambda d: d.name)
-    def test_recipe_has_build_script(self, recipe_dir):
-        """Test that each recipe has at least one build script."""
+class Recipe(NamedTuple):
+    """A recipe directory's files, read once at import."""
+
+    name: str
+    dir: Path
+    meta_text: Optional[str]  # None if meta.yaml is missing or unreadable
+    build_sh: Optional[Path]
+    bld_bat: Optional[Path]
+
+
+def _read_text(path):
+    """A file's text, or None if it can't be read."""
+    try:
+        return path.read_text()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _load_all_recipes():
+    """Read every recipe's meta.yaml and locate its build scripts."""
+    recipes = []
+    for recipe_dir in get_recipe_dirs():
         build_sh = recipe_dir / "build.sh"
         bld_bat = recipe_dir / "bld.bat"
+        recipes.append(
+            Recipe(
+                name=recipe_dir.name,
+                dir=recipe_dir,
+                meta_text=_read_text(recipe_dir / "meta.yaml"),
+                build_sh=build_sh if build_sh.exists() else None,
+                bld_bat=bld_bat if bld_bat.exists() else None,
+            )
+        )
+    return recipes
+
+
+# Loaded at import, so collection and the tests share one read of each recipe
+_RECIPES = _load_all_recipes()
+
+
+@pytest.fixture(scope="session")
+def parsed_meta():
+    """Each recipe's parsed meta.yaml, as (parsed, YAML error or None) keyed by recipe name."""
+    parsed = {}
+    for recipe in _RECIPES:
+        if recipe.meta_text is None:
+            # Reported by test_recipe_has_meta_yaml
+            parsed[recipe.name] = (None, None)
+            continue
+        try:
+            parsed[recipe.name] = (
+                yaml.load(_strip_jinja(recipe.meta_text), Loader=_SafeLoader),
+                None,
+            )
+        except yaml.YAMLError as e:
+            parsed[recipe.name] = (None, e)
+    return parsed
+
+
+# Checks each script given as an argument in one bash process, printing
+# NUL-separated (path, error) pairs for those that fail to parse
+_BASH_SYNTAX_CHECK = """
+for f in "$@"; do
+    if ! err=$(bash -n "$f" 2>&1); then
+        printf '%s\\0%s\\0' "$f" "$err"
+    fi
+done
+"""
+
+
+@pytest.fixture(scope="session")
+def build_sh_errors():
+    """bash -n errors for every recipe's build.sh, keyed by script path."""
+    import subprocess
 
+    scripts = [str(recipe.build_sh) for recipe in _RECIPES if recipe.build_sh is not None]
+    if not scripts:
+        return {}
+    result = subprocess.run(
+        ["bash", "-c", _BASH_SYNTAX_CHECK, "bash", *scripts], capture_output=True, text=True
+    )
+    fields = result.stdout.split("\0")
+    return dict(zip(fields[0:-1:2], fields[1::2]))
+
+
+# Test ids, built once for all the parametrized tests
+_RECIPE_IDS = [recipe.name for recipe in _RECIPES]
+
+
+class TestRecipeStructure:
+    """Tests for recipe structure and validity."""
+
+    @pytest.mark.parametrize("recipe", _RECIPES, ids=_RECIPE_IDS)
+    def test_recipe_has_meta_yaml(self, recipe):
+        """Test that each recipe has a readable meta.yaml file."""
+        assert recipe.meta_text is not None, f"Recipe {recipe.name} missing or unreadable meta.yaml"
+
+    @pytest.mark.parametrize("recipe", _RECIPES, ids=_RECIPE_IDS)
+    def test_recipe_meta_yaml_valid(self, recipe, parsed_meta):
+        """Test that meta.yaml is valid YAML (basic syntax check)."""
+        _, error = parsed_meta[recipe.name]
+        if error is not None:
+            pytest.fail(f"Invalid YAML in {recipe.name}/meta.yaml: {error}")
+
+    @pytest.mark.parametrize("recipe", _RECIPES, ids=_RECIPE_IDS)
+    def test_recipe_has_build_script(self, recipe):
+        """Test that each recipe has at least one build script."""
         assert (
-            build_sh.exists() or bld_bat.exists()
-        ), f"Recipe {recipe_dir.name} missing build script (build.sh or bld.bat)"
+            recipe.build_sh or recipe.bld_bat
+        ), f"Recipe {recipe.name} missing build script (build.sh or bld.bat)"
 
-    @pytest.mark.parametrize("recipe_dir", get_recipe_dirs(), ids=lambda d: d.name)
-    def test_build_sh_syntax(self, recipe_dir):
+    @pytest.mark.parametrize("recipe", _RECIPES, ids=_RECIPE_IDS)
+    def test_build_sh_syntax(self, recipe, build_sh_errors):
         """Test that build.sh has valid bash syntax."""
-        build_sh = recipe_dir / "build.sh"
-        if not build_sh.exists():
+        if recipe.build_sh is None:
             pytest.skip("No build.sh")
 
-        import subprocess
+        error = build_sh_errors.get(str(recipe.build_sh))
+        assert error is None, f"Syntax error in {recipe.name}/build.sh: {error}"
 
-        result = subprocess.run(["bash", "-n", str(build_sh)], capture_output=True, text=True)
-        assert (
-            result.returncode == 0
-        ), f"Syntax error in {recipe_dir.name}/build.sh: {result.stderr}"
+
+@pytest.fixture(scope="session")
+def parsed_build_config():
+    """conda_build_config.yaml, read and parsed once per session; None if missing."""
+    config_file = RECIPES_DIR / "conda_build_config.yaml"
+    if not config_file.exists():
+        return None
+    raw = config_file.read_text()
+    try:
+        parsed = yaml.load(_strip_selectors(raw), Loader=_SafeLoader)
+        error = None
+    except yaml.YAMLError as e:
+        parsed = None
+        error = e
+    return {"raw": raw, "parsed": parsed, "error": error}
 
 
 class TestCondaBuildConfig:
@@ -84,38 +196,21 @@ class TestCondaBuildConfig:
         config_file = RECIPES_DIR / "conda_build_config.yaml"
         assert config_file.exists(), "Missing conda_build_config.yaml"
 
-    def test_config_valid_yaml(self):
+    def test_config_valid_yaml(self, parsed_build_config):
         """Test that config file is valid YAML."""
-        config_file = RECIPES_DIR / "conda_build_config.yaml"
-        if not config_file.exists():
+        if parsed_build_config is None:
             pytest.skip("No config file")
+        error = parsed_build_config["error"]
+        if error is not None:
+            pytest.fail(f"Invalid YAML in conda_build_config.yaml: {error}")
+        assert parsed_build_config["parsed"] is not None
 
-        content = config_file.read_text()
-        # Remove platform selectors for YAML parsing
-        content = "\n".join(
-            line.split("#")[0] if "#" in line and "[" in line else line
-            for line in content.split("\n")
-        )
-
-        try:
-            config = yaml.safe_load(content)
-            assert config is not None
-        except yaml.YAMLError as e:
-            pytest.fail(f"Invalid YAML in conda_build_config.yaml: {e}")
-
-    def test_config_has_required_versions(self):
+    def test_config_has_required_versions(self, parsed_build_config):
         """Test that config has VFX Platform 2024 versions."""
-        config_file = RECIPES_DIR / "conda_build_config.yaml"
-        if not config_file.exists():
+        if parsed_build_config is None:
             pytest.skip("No config file")
-
-        content = config_file.read_text()
-        content = "\n".join(
-            line.split("#")[0] if "#" in line and "[" in line else line
-            for line in content.split("\n")
-        )
-
-        config = yaml.safe_load(content)
+        config = parsed_build_config["parsed"]
+        assert config is not None, "conda_build_config.yaml did not parse"
 
         # Check for key VFX Platform 2024 versions
         assert "python" in config, "Missing python version"